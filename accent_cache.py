@@ -0,0 +1,21 @@
+# accent_cache.py
+
+from functools import lru_cache
+
+from unidecode import unidecode
+
+# City names, street names and default names ("À l'occupant") repeat thousands of
+# times per batch, so transliterating each distinct string once is enough.
+ACCENT_CACHE_SIZE = 65536
+
+@lru_cache(maxsize=ACCENT_CACHE_SIZE)
+def strip_accents(text):
+    """Accent-stripping (unidecode) with a bounded LRU cache shared by all callers."""
+    return unidecode(text)
+
+def accent_cache_info():
+    """Returns the cache counters (hits, misses, maxsize, currsize)."""
+    return strip_accents.cache_info()
+
+def clear_accent_cache():
+    strip_accents.cache_clear()
@@ -0,0 +1,10 @@
+"""
+Benchmarks for the PDF to Excel pipeline.
+
+    python -m benchmarks --pages 50 --rows-per-page 40 --output bench.json
+    python -m benchmarks.startup
+
+See benchmarks/run.py for the options, benchmarks/synthetic_pdf.py for the
+synthetic Centris-style PDF generator and benchmarks/startup.py for the
+GUI/CLI start-up budget.
+"""
@@ -0,0 +1,198 @@
+# benchmarks/run.py
+
+"""
+Times each stage of the conversion pipeline on a synthetic Centris PDF and
+reports throughput (rows/sec) and peak RSS as JSON, so runs can be compared
+before and after a change.
+
+    python -m benchmarks --pages 100 --rows-per-page 40 --repeat 3 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Allow running from a checkout without installing anything
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pdfplumber
+
+from pdf2excel import (
+    _filter_and_clean_df, _filter_by_branch, add_name_columns_to_df, address_normalizer,
+    convert_pdf_to_excel, extract_with_pdfplumber, write_csv, write_excel
+)
+from instrumentation import peak_rss_bytes
+from benchmarks.startup import measure_startup
+from benchmarks.synthetic_pdf import generate_centris_pdf
+
+COLUMN_NAMES = {
+    'First Name': 'First Name',
+    'Last Name': 'Last Name',
+    'Address': 'Address',
+    'City': 'City',
+    'Province': 'Province',
+    'Postal Code': 'Postal Code'
+}
+BRANCH_IDS = {
+    'flyer_north_shore': 'flyer_north_shore',
+    'flyer_south_shore': 'flyer_south_shore',
+    'flyer_montreal': 'flyer_montreal',
+    'flyer_laval': 'flyer_laval',
+    'flyer_longueuil': 'flyer_longueuil',
+    'flyer_unknown': 'flyer_unknown'
+}
+FORMATS = ['xlsx', 'csv']
+
+def _timed(stages, name, rows_in, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    rows_out = len(result[0]) if isinstance(result, tuple) else len(result)
+    if rows_in is None:
+        rows_in = rows_out
+    stages[name] = {
+        'seconds': elapsed,
+        'rows_in': rows_in,
+        'rows_out': rows_out,
+        'rows_per_sec': rows_in / elapsed if elapsed > 0 else None,
+    }
+    return result
+
+def _write_csv(df, filename):
+    write_csv(df, filename)
+    return df
+
+def _write_xlsx(df, filename):
+    write_excel(df, filename)
+    return df
+
+def run_stages(pdf_path, file_format, output_dir, engine='table'):
+    """One pass through the pipeline stages, mirroring process_pdfs() / convert_pdf_to_excel()."""
+    stages = {}
+    df = _timed(stages, 'extract', None, extract_with_pdfplumber, pdf_path, engine=engine)
+    
+    df = _timed(stages, 'st_filter', len(df), _filter_and_clean_df, df)
+    df = _timed(stages, 'region_map', len(df), _filter_by_branch, df, BRANCH_IDS, False)
+    
+    cleaned, apartments = _timed(stages, 'clean', len(df), address_normalizer.normalize_many,
+                                 df['address'].tolist(), extract_apt=True, remove_accents=True)
+    output_df = pd.DataFrame({
+        COLUMN_NAMES['Address']: cleaned,
+        COLUMN_NAMES['City']: df['municipality_borough'].tolist(),
+        COLUMN_NAMES['Province']: ['QC'] * len(df),
+        COLUMN_NAMES['Postal Code']: df['postal_code'].tolist(),
+        'Branch ID': df['Branch ID'].tolist(),
+        'Apartment': apartments,
+    })
+    
+    output_df = _timed(stages, 'name_columns', len(output_df), add_name_columns_to_df, output_df,
+                       merge_names=False, merged_name='Full Name', column_names=COLUMN_NAMES,
+                       default_values={}, remove_accents=True)
+    output_df = _timed(stages, 'sort', len(output_df), output_df.sort_values,
+                       ['Branch ID', COLUMN_NAMES['City'], COLUMN_NAMES['Address']])
+    
+    filename = os.path.join(output_dir, f'bench_output.{file_format}')
+    writer = _write_xlsx if file_format == 'xlsx' else _write_csv
+    _timed(stages, 'write', len(output_df), writer, output_df, filename)
+    stages['write']['output_bytes'] = os.path.getsize(filename)
+    return stages
+
+def run_end_to_end(pdf_path, file_format, output_dir, engine='table'):
+    """Wall time of a full convert_pdf_to_excel() call with region filtering and apartments."""
+    start = time.perf_counter()
+    for _ in convert_pdf_to_excel(
+        [pdf_path], output_dir, custom_filename='bench_end_to_end', column_names=dict(COLUMN_NAMES),
+        file_format=file_format, should_extract_apartment=True, filter_by_region=True,
+        region_branch_ids=BRANCH_IDS, remove_accents=True, use_cache=False, engine=engine
+    ):
+        pass
+    return time.perf_counter() - start
+
+def _best(runs):
+    """Keeps the fastest repeat of each stage."""
+    best = {}
+    for stages in runs:
+        for name, stats in stages.items():
+            if name not in best or stats['seconds'] < best[name]['seconds']:
+                best[name] = stats
+    return best
+
+def run_benchmarks(pages=20, rows_per_page=40, rows=None, apartment_ratio=0.3, cpp_ratio=0.3,
+                   old_format=False, repeat=1, formats=FORMATS, seed=0, engine='table'):
+    """Generates the PDF, runs every stage for each format and returns the report dict."""
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = os.path.join(work_dir, 'synthetic_centris.pdf')
+        total_rows = generate_centris_pdf(
+            pdf_path, pages=pages, rows_per_page=rows_per_page, rows=rows,
+            apartment_ratio=apartment_ratio, cpp_ratio=cpp_ratio, old_format=old_format, seed=seed
+        )
+        
+        results = {}
+        for file_format in formats:
+            runs = [run_stages(pdf_path, file_format, work_dir, engine) for _ in range(repeat)]
+            end_to_end = min(run_end_to_end(pdf_path, file_format, work_dir, engine) for _ in range(repeat))
+            results[file_format] = {
+                'stages': _best(runs),
+                'end_to_end_seconds': end_to_end,
+                'end_to_end_rows_per_sec': total_rows / end_to_end if end_to_end > 0 else None,
+            }
+        pdf_bytes = os.path.getsize(pdf_path)
+    
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'pdfplumber': getattr(pdfplumber, '__version__', None),
+        },
+        'params': {
+            'pages': pages, 'rows_per_page': rows_per_page, 'rows': rows,
+            'apartment_ratio': apartment_ratio, 'cpp_ratio': cpp_ratio,
+            'old_format': old_format, 'repeat': repeat, 'seed': seed, 'engine': engine,
+        },
+        'input': {'rows': total_rows, 'pdf_bytes': pdf_bytes},
+        'results': results,
+        'peak_rss_bytes': peak_rss_bytes(),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--rows-per-page', type=int, default=40)
+    parser.add_argument('--rows', type=int, default=None, help="total row count (overrides --pages)")
+    parser.add_argument('--apartment-ratio', type=float, default=0.3)
+    parser.add_argument('--cpp-ratio', type=float, default=0.3)
+    parser.add_argument('--old-format', action='store_true', help="4-column layout without the ST column")
+    parser.add_argument('--repeat', type=int, default=1, help="repeats per stage; the fastest is reported")
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=FORMATS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--engine', choices=['table', 'layout'], default='table', help="extraction engine")
+    parser.add_argument('--skip-startup', action='store_true', help="don't measure GUI/CLI start-up time")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    
+    report = run_benchmarks(
+        pages=args.pages, rows_per_page=args.rows_per_page, rows=args.rows,
+        apartment_ratio=args.apartment_ratio, cpp_ratio=args.cpp_ratio,
+        old_format=args.old_format, repeat=args.repeat, formats=args.formats, seed=args.seed,
+        engine=args.engine
+    )
+    if not args.skip_startup:
+        report['startup'] = measure_startup(repeat=max(args.repeat, 3))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# benchmarks/startup.py
+
+"""
+Measures cold-start time of the GUI and CLI entry points, each in a fresh
+interpreter, and checks it against STARTUP_BUDGET.
+
+    python -m benchmarks.startup --repeat 5
+
+Heavy dependencies (pandas, pdfplumber, openpyxl) should only load on the first
+conversion; every probe also reports which of them were imported, so a stray
+top-level import shows up here before it shows up on an operator's laptop.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['pandas', 'pdfplumber', 'openpyxl', 'PyQt5']
+CONVERSION_MODULES = {'pandas', 'pdfplumber', 'openpyxl'}
+
+# Seconds of process wall time over a bare interpreter (python -c pass). Generous
+# enough for an operator's laptop; on a dev machine these run well under budget.
+STARTUP_BUDGET = {
+    'import_pdf2excel': 0.15,
+    'import_cli': 0.15,
+    'gui_window': 0.75,
+}
+
+_REPORT = (
+    "import json, sys, time\n"
+    "elapsed = time.perf_counter() - _start\n"
+    f"print(json.dumps({{'seconds': elapsed, 'modules': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+)
+
+PROBES = {
+    'interpreter': "pass\n",
+    'import_pdf2excel': "import pdf2excel\n",
+    'import_cli': "import pdf2excel_cli\n",
+    # Time until the main window has been shown and painted once (offscreen, no display needed)
+    'gui_window': (
+        "from PyQt5.QtWidgets import QApplication\n"
+        "app = QApplication(['pdf2excel_gui'])\n"
+        "import pdf2excel_gui\n"
+        "window = pdf2excel_gui.PDFToExcelGUI()\n"
+        "window.show()\n"
+        "app.processEvents()\n"
+    ),
+    # What the first conversion pays on top of start-up
+    'first_conversion_imports': "import pdf2excel, pandas, pdfplumber, openpyxl\n",
+}
+
+def run_probe(code):
+    """
+    Runs code in a fresh interpreter from the repo root. Returns its in-process time,
+    the whole process's wall time (interpreter start-up included) and the heavy modules loaded.
+    """
+    script = "import time\n_start = time.perf_counter()\n" + code + _REPORT
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', script], cwd=REPO_DIR, env=env,
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'}
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['wall_seconds'] = wall
+    return report
+
+def measure_startup(repeat=3):
+    """Best-of-repeat time per probe, net of a bare interpreter, with budget verdicts."""
+    results = {}
+    for name, code in PROBES.items():
+        runs = [run_probe(code) for _ in range(repeat)]
+        ok_runs = [r for r in runs if 'error' not in r]
+        if not ok_runs:
+            results[name] = {'error': runs[0]['error']}
+            continue
+        results[name] = {
+            'wall_seconds': min(r['wall_seconds'] for r in ok_runs),
+            'in_process_seconds': min(r['seconds'] for r in ok_runs),
+            'heavy_modules_loaded': ok_runs[0]['modules'],
+        }
+
+    base = results['interpreter'].get('wall_seconds', 0.0)
+    for name, result in results.items():
+        if 'wall_seconds' not in result or name == 'interpreter':
+            continue
+        result['net_seconds'] = max(result['wall_seconds'] - base, 0.0)
+        if name in STARTUP_BUDGET:
+            result['budget_seconds'] = STARTUP_BUDGET[name]
+            # Start-up probes must not pull in the conversion stack either
+            result['lazy_imports_ok'] = not CONVERSION_MODULES.intersection(result['heavy_modules_loaded'])
+            result['within_budget'] = result['net_seconds'] <= STARTUP_BUDGET[name] and result['lazy_imports_ok']
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.startup',
+                                     description="Measure GUI/CLI cold-start time against the startup budget.")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per probe; the fastest is reported")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = measure_startup(args.repeat)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    over_budget = [name for name, r in results.items() if r.get('within_budget') is False]
+    return 1 if over_budget else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# benchmarks/synthetic_pdf.py
+
+"""
+Generates synthetic Centris-style listing PDFs for benchmarking.
+
+The PDF is written by hand (plain content streams, Helvetica, ruled table grid)
+so no PDF library is needed. pdfplumber's extract_table() picks the grid up the
+same way it does on real exports.
+"""
+
+import random
+
+CURRENT_COLUMNS = [("ST", 30), ("Centris No.", 90), ("Mun./Bor.", 150), ("Address", 210), ("Postal Code", 70)]
+# Old exports had no ST column
+OLD_COLUMNS = CURRENT_COLUMNS[1:]
+
+CITIES = [
+    'Montréal (Ahuntsic-Cartierville)', 'Laval', 'Brossard', 'Terrebonne', 'Châteauguay',
+    'Pointe-Claire', 'Candiac', 'Longueuil', 'Hudson', 'Saint-Jérôme', 'Vaudreuil-Dorion',
+    'Repentigny', 'Blainville', 'Saint-Lambert', 'Boucherville', 'Granby',
+]
+STREETS = [
+    'Rue Principale', 'Boul. Saint-Laurent', 'Av. du Parc', 'Ch. de la Côte-des-Neiges',
+    'rue Sainte-Catherine', 'Boul. des Laurentides', 'Rue Notre-Dame', 'Av. Papineau',
+]
+STATUSES = ['SO', 'AC', 'EX', 'NE']
+FSA_LETTERS = 'ABCEGHJKLMNPRSTVWXYZ'
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+MARGIN_LEFT, MARGIN_TOP = 20, 40
+ROW_HEIGHT = 16
+FONT_SIZE = 7
+
+def make_rows(row_count, apartment_ratio=0.3, cpp_ratio=0.3, seed=0):
+    """Random listing rows [st, centris_no, municipality, address, postal_code]."""
+    rnd = random.Random(seed)
+    rows = []
+    for _ in range(row_count):
+        centris_no = str(rnd.randint(10000000, 29999999))
+        if rnd.random() < cpp_ratio:
+            centris_no += ' CPP'
+        address = f"{rnd.randint(1, 9999)} {rnd.choice(STREETS)}"
+        if rnd.random() < apartment_ratio:
+            address += f", apt. {rnd.randint(1, 450)}"
+        postal_code = (f"{rnd.choice('HJ')}{rnd.randint(1, 9)}{rnd.choice(FSA_LETTERS)} "
+                       f"{rnd.randint(1, 9)}{rnd.choice(FSA_LETTERS)}{rnd.randint(1, 9)}")
+        rows.append([rnd.choice(STATUSES), centris_no, rnd.choice(CITIES), address, postal_code])
+    return rows
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def _page_stream(columns, rows):
+    """Content stream drawing one page: header row + data rows inside a ruled grid."""
+    table_width = sum(width for _, width in columns)
+    top = PAGE_HEIGHT - MARGIN_TOP
+    ops = ['0.5 w']
+    y = top
+    for row in [[name for name, _ in columns]] + rows:
+        ops.append(f"{MARGIN_LEFT} {y} m {MARGIN_LEFT + table_width} {y} l S")
+        x = MARGIN_LEFT
+        for (_, width), value in zip(columns, row):
+            ops.append(f"BT /F1 {FONT_SIZE} Tf {x + 2} {y - 11} Td ({_escape(value)}) Tj ET")
+            x += width
+        y -= ROW_HEIGHT
+    bottom = y
+    ops.append(f"{MARGIN_LEFT} {bottom} m {MARGIN_LEFT + table_width} {bottom} l S")
+    x = MARGIN_LEFT
+    for _, width in columns:
+        ops.append(f"{x} {top} m {x} {bottom} l S")
+        x += width
+    ops.append(f"{x} {top} m {x} {bottom} l S")
+    # WinAnsiEncoding is cp1252, which covers the French accents in city names
+    return '\n'.join(ops).encode('cp1252', errors='replace')
+
+def write_pdf(path, pages):
+    """Writes a PDF where pages is a list of content streams (bytes)."""
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    }
+    kids = []
+    next_id = 4
+    for stream in pages:
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        kids.append(f"{page_id} 0 R")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode()
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+    
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += f"{obj_id} 0 obj\n".encode() + objects[obj_id] + b"\nendobj\n"
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for obj_id in sorted(objects):
+        out += f"{offsets[obj_id]:010d} 00000 n \n".encode()
+    out += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n").encode()
+    
+    with open(path, 'wb') as f:
+        f.write(out)
+
+MAX_ROWS_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN_TOP) // ROW_HEIGHT - 1
+
+def generate_centris_pdf(path, pages=10, rows_per_page=40, rows=None, apartment_ratio=0.3,
+                         cpp_ratio=0.3, old_format=False, seed=0):
+    """
+    Writes a synthetic Centris export to path and returns the total number of data rows.
+    rows, when given, sets the total row count (and overrides pages).
+    old_format=True drops the ST column (4-column layout of older exports).
+    """
+    rows_per_page = max(1, min(rows_per_page, MAX_ROWS_PER_PAGE))
+    row_count = rows if rows is not None else pages * rows_per_page
+    rows = make_rows(row_count, apartment_ratio, cpp_ratio, seed)
+    columns = OLD_COLUMNS if old_format else CURRENT_COLUMNS
+    if old_format:
+        rows = [row[1:] for row in rows]
+    
+    streams = [
+        _page_stream(columns, rows[i:i + rows_per_page])
+        for i in range(0, len(rows), rows_per_page)
+    ]
+    write_pdf(path, streams)
+    return len(rows)
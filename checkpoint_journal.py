@@ -0,0 +1,80 @@
+# checkpoint_journal.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from extraction_cache import file_sha256
+
+DEFAULT_JOURNAL_PATH = 'checkpoints.sqlite'
+
+class CheckpointJournal:
+    """
+    Per-row checkpoints of a geocoding/validation run over one PDF, so a run that
+    crashes or gets rate-limited part way resumes where it stopped instead of
+    querying every address again.
+
+    Rows are keyed by the SHA-256 of the PDF bytes, the script (source) and the row
+    index in the extracted table; each resolved row's result is written (and
+    committed) as soon as it is known. A restarted run takes completed() as done,
+    looks up only the other rows, and builds its output from both. Once the output
+    file is written, finish() drops the PDF's rows.
+
+    Safe to use from worker threads (one connection behind a lock).
+    """
+    def __init__(self, pdf_path, source, path=None):
+        self.path = path or os.getenv('CHECKPOINT_JOURNAL_PATH', DEFAULT_JOURNAL_PATH)
+        self.pdf_hash = file_sha256(pdf_path)
+        self.source = source
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                " pdf_hash TEXT NOT NULL,"
+                " source TEXT NOT NULL,"
+                " row_index INTEGER NOT NULL,"
+                " result TEXT NOT NULL,"
+                " recorded_at REAL NOT NULL,"
+                " PRIMARY KEY (pdf_hash, source, row_index))"
+            )
+
+    def completed(self):
+        """Results recorded so far, as {row_index: result}."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row_index, result FROM checkpoints WHERE pdf_hash = ? AND source = ?",
+                (self.pdf_hash, self.source),
+            ).fetchall()
+        return {row_index: json.loads(result) for row_index, result in rows}
+
+    def record(self, row_index, result):
+        """Records one row's result (any JSON-serializable value)."""
+        self.record_many([(row_index, result)])
+
+    def record_many(self, items):
+        """Records (row_index, result) pairs in one transaction."""
+        now = time.time()
+        values = [(self.pdf_hash, self.source, int(row_index), json.dumps(result), now)
+                  for row_index, result in items]
+        if not values:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO checkpoints (pdf_hash, source, row_index, result, recorded_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                values,
+            )
+
+    def finish(self):
+        """Drops this PDF's checkpoints once its output has been written."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE pdf_hash = ? AND source = ?",
+                               (self.pdf_hash, self.source))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
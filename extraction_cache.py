@@ -0,0 +1,144 @@
+# extraction_cache.py
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+def _user_cache_dir():
+    """Per-user cache location: %LOCALAPPDATA%\\PDF2Excel on Windows, $XDG_CACHE_HOME (~/.cache)/pdf2excel elsewhere."""
+    if os.name == 'nt' and os.getenv('LOCALAPPDATA'):
+        return os.path.join(os.environ['LOCALAPPDATA'], 'PDF2Excel')
+    base = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'pdf2excel')
+
+# Outside the working directory, so the GUI also caches when started from a read-only install folder
+DEFAULT_CACHE_DIR = os.path.join(_user_cache_dir(), 'extraction_cache')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ExtractionCache:
+    """
+    On-disk cache of extracted PDF rows, keyed by the SHA-256 of the PDF bytes plus
+    the extractor version, so the same file is only parsed by pdfplumber once.
+    
+    Each entry is one pickle file holding the extracted table as column lists. The directory is
+    kept under max_bytes by evicting the least recently used entries (file mtime is
+    refreshed on every hit).
+    
+    The cache is best-effort: if its directory can't be created or written, a warning
+    is logged and the cache is disabled (every get() misses and put() does nothing),
+    so extraction still succeeds uncached.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = True
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError as e:
+            self._disable(f"can't create {self.cache_dir}: {e}")
+    
+    def _disable(self, reason):
+        logging.warning(f"Extraction cache disabled, extracting uncached ({reason})")
+        self.enabled = False
+    
+    def key_for(self, pdf_path, version):
+        return f"{file_sha256(pdf_path)}-v{version}"
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+    
+    def get(self, key):
+        """Returns the cached column lists or None on a miss."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Discarding unreadable extraction cache entry {path}: {e}")
+            self._remove(path)
+            return None
+        
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return entry['columns']
+    
+    def put(self, key, columns, evict=True):
+        """
+        Stores column lists and evicts old entries if the cache grew past max_bytes.
+        Callers storing many small entries in a row can pass evict=False and call evict() once.
+        """
+        if not self.enabled:
+            return
+        entry = {'columns': columns}
+        
+        # Write to a temp file first so concurrent workers never see a partial entry
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        except OSError as e:
+            self._disable(f"can't write to {self.cache_dir}: {e}")
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            self._remove(tmp_path)
+            self._disable(f"can't write to {self.cache_dir}: {e}")
+            return
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        if evict:
+            self.evict()
+    
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.pkl'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # Evicted by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+    
+    def evict(self):
+        if not self.enabled:
+            return
+        try:
+            entries = self._entries()
+        except OSError as e:
+            logging.warning(f"Skipping extraction cache eviction in {self.cache_dir}: {e}")
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            logging.info(f"Evicted extraction cache entry {os.path.basename(path)}")
+    
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,124 @@
+# geocode_store.py
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from accent_cache import strip_accents
+from city_mappings import get_city_from_borough
+
+DEFAULT_STORE_PATH = 'geocode_store.sqlite'
+# Street addresses keep their postal code for years; results older than this are looked up again
+DEFAULT_TTL_DAYS = 180
+
+def normalize_address(address):
+    """Case- and accent-insensitive form of a street address, with punctuation and spacing collapsed."""
+    if not address:
+        return ""
+    text = strip_accents(str(address)).casefold()
+    text = re.sub(r'[.,;:]+', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def address_key(address, city):
+    """
+    Store key for a street address (without its apartment, i.e. the first value
+    returned by separate_apartment) in a Mun/Bor. value. The borough is mapped with
+    get_city_from_borough first so every borough of a city shares its entries.
+    """
+    mapped_city = get_city_from_borough(city) if isinstance(city, str) and city else ""
+    return f"{normalize_address(address)}|{normalize_address(mapped_city)}"
+
+class GeocodeStore:
+    """
+    Persistent address -> (postal code, province, city, confidence) store shared by
+    pdf2excel_postgrid and pdf2excel_googlemaps, so an address validated once by
+    either script is not sent to an API again until its entry is older than ttl_days.
+
+    One SQLite file, safe to use from the geocoding worker threads (every query
+    goes through a single connection behind a lock).
+    """
+    def __init__(self, path=None, ttl_days=None):
+        self.path = path or os.getenv('GEOCODE_STORE_PATH', DEFAULT_STORE_PATH)
+        if ttl_days is None:
+            ttl_days = float(os.getenv('GEOCODE_STORE_TTL_DAYS', DEFAULT_TTL_DAYS))
+        self.ttl_seconds = ttl_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocodes ("
+                " key TEXT PRIMARY KEY,"
+                " line1 TEXT,"
+                " postal_code TEXT,"
+                " province TEXT,"
+                " city TEXT,"
+                " confidence TEXT,"
+                " source TEXT,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS geocodes_updated_at ON geocodes (updated_at)")
+
+    def get(self, address, city):
+        """The stored result for address in city as a dict, or None if missing or expired."""
+        key = address_key(address, city)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT line1, postal_code, province, city, confidence, source, updated_at"
+                " FROM geocodes WHERE key = ? AND updated_at >= ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        line1, postal_code, province, result_city, confidence, source, updated_at = row
+        return {
+            'line1': line1,
+            'postal_code': postal_code,
+            'province': province,
+            'city': result_city,
+            'confidence': confidence,
+            'source': source,
+            'updated_at': updated_at,
+        }
+
+    def put(self, address, city, postal_code, province, result_city, confidence='high', source=None, line1=None):
+        """
+        Stores (or refreshes) the result for address in city. Results without a postal
+        code are not stored, so a failed lookup is retried on the next run.
+        """
+        if not postal_code:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocodes"
+                " (key, line1, postal_code, province, city, confidence, source, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (address_key(address, city), line1, postal_code, province, result_city,
+                 confidence, source, time.time()),
+            )
+
+    def purge_expired(self):
+        """Deletes expired entries and returns how many were removed."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM geocodes WHERE updated_at < ?",
+                                        (time.time() - self.ttl_seconds,))
+        return cursor.rowcount
+
+    def log_stats(self, logger=logging):
+        logger.info(f"Geocode store {self.path}: {self.hits} hits, {self.misses} misses")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,185 @@
+# instrumentation.py
+
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILERS = ('cprofile', 'pyinstrument')
+
+def current_rss_bytes():
+    """Resident set size of this process right now, or None where it can't be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where it can't be read."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset
+        except ImportError:
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class Stage:
+    """Handle yielded by StageTimer.stage(); set rows_out (and rows_in if not known upfront)."""
+    def __init__(self, rows_in=None):
+        self.rows_in = rows_in
+        self.rows_out = None
+
+class StageTimer:
+    """
+    Records wall time, CPU time, row counts in/out and RSS delta for each pipeline stage.
+
+        with timer.stage('st_filter', rows_in=len(df)) as stage:
+            df = _filter_and_clean_df(df)
+            stage.rows_out = len(df)
+
+    Records are plain dicts so they can be sent back from worker processes and
+    dumped to JSON as-is. current_pdf is stamped on every record.
+    """
+    def __init__(self):
+        self.records = []
+        self.current_pdf = None
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        handle = Stage(rows_in)
+        rss_before = current_rss_bytes()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        try:
+            yield handle
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            rss_after = current_rss_bytes()
+            self.records.append({
+                'stage': name,
+                'pdf': self.current_pdf,
+                'wall_seconds': wall,
+                'cpu_seconds': cpu,
+                'rows_in': handle.rows_in,
+                'rows_out': handle.rows_out,
+                'rows_per_sec': handle.rows_in / wall if handle.rows_in and wall > 0 else None,
+                'rss_after_bytes': rss_after,
+                'memory_delta_bytes': (rss_after - rss_before
+                                       if rss_before is not None and rss_after is not None else None),
+            })
+
+    def extend(self, records):
+        self.records.extend(records)
+
+class _NullTimer:
+    """Stand-in used when instrumentation is off; stage() costs one object allocation."""
+    records = ()
+    current_pdf = None
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        yield Stage(rows_in)
+
+    def extend(self, records):
+        pass
+
+NULL_TIMER = _NullTimer()
+
+def summarize_stages(records):
+    """Totals per stage name, in first-seen order."""
+    totals = {}
+    for record in records:
+        total = totals.setdefault(record['stage'], {
+            'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows_in': 0, 'rows_out': 0, 'calls': 0
+        })
+        total['wall_seconds'] += record['wall_seconds']
+        total['cpu_seconds'] += record['cpu_seconds']
+        total['rows_in'] += record['rows_in'] or 0
+        total['rows_out'] += record['rows_out'] or 0
+        total['calls'] += 1
+    return totals
+
+def report_path_for(output_filename):
+    """Timing report path next to an output file: foo.xlsx -> foo.timing.json."""
+    return os.path.splitext(output_filename)[0] + '.timing.json'
+
+def write_timing_report(path, records, output_file=None, options=None, profile_file=None):
+    """Writes the stage records plus per-stage totals and peak RSS as JSON."""
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'output_file': output_file,
+        'options': options or {},
+        'stages': list(records),
+        'totals': summarize_stages(records),
+        'total_wall_seconds': sum(r['wall_seconds'] for r in records),
+        'peak_rss_bytes': peak_rss_bytes(),
+        'profile_file': profile_file,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=str)
+    logging.info(f"Timing report written to {path}")
+    return path
+
+class Profiler:
+    """
+    Optional whole-run profiler: 'cprofile' (stdlib, writes a .prof file for pstats/snakeviz)
+    or 'pyinstrument' (optional dependency, writes an .html report).
+    Only code running in this process is profiled, not worker processes.
+    """
+    def __init__(self, kind):
+        if kind not in PROFILERS:
+            raise ValueError(f"Unknown profiler {kind!r}; expected one of {PROFILERS}")
+        self.kind = kind
+        self.running = False
+        if kind == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+        else:
+            try:
+                from pyinstrument import Profiler as PyinstrumentProfiler
+            except ImportError as e:
+                raise ImportError(
+                    "profile='pyinstrument' requires the pyinstrument package (pip install pyinstrument)"
+                ) from e
+            self._profiler = PyinstrumentProfiler()
+
+    def start(self):
+        if self.kind == 'cprofile':
+            self._profiler.enable()
+        else:
+            self._profiler.start()
+        self.running = True
+
+    def stop(self):
+        if self.kind == 'cprofile':
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+        self.running = False
+
+    def save(self, base_path):
+        """Writes the profile next to base_path and returns the file name."""
+        if self.kind == 'cprofile':
+            path = os.path.splitext(base_path)[0] + '.prof'
+            self._profiler.dump_stats(path)
+        else:
+            path = os.path.splitext(base_path)[0] + '.profile.html'
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self._profiler.output_html())
+        logging.info(f"Profile written to {path}")
+        return path
@@ -0,0 +1,112 @@
+# layout_extraction.py
+
+from bisect import bisect_right
+
+# Same 3pt tolerance pdfplumber's table finder uses to snap and join ruling lines
+SNAP_TOLERANCE = 3
+
+def _cluster(values, tolerance=SNAP_TOLERANCE):
+    """Groups sorted values closer than tolerance and returns each group's mean."""
+    clusters = []
+    for value in sorted(values):
+        if clusters and value - clusters[-1][-1] <= tolerance:
+            clusters[-1].append(value)
+        else:
+            clusters.append([value])
+    return [sum(c) / len(c) for c in clusters]
+
+class ColumnLayout:
+    """
+    Column x-boundaries of the Centris table, learned once from a page where
+    pdfplumber's table finder ran. Every Centris export uses the same fixed layout,
+    so later pages skip table detection: their row boundaries come from the
+    horizontal ruling lines and each character is bucketed into its cell by position,
+    with the same centre-in-cell rule and text extraction that Table.extract() uses.
+
+    extract_rows() returns None whenever a page doesn't match the learned layout,
+    and the caller falls back to page.extract_table().
+    """
+    def __init__(self, boundaries):
+        self.boundaries = boundaries
+        self.left = boundaries[0]
+        self.right = boundaries[-1]
+
+    @classmethod
+    def from_table(cls, table):
+        """Layout of a pdfplumber Table, or None if its columns aren't a simple grid."""
+        if table is None or not table.rows:
+            return None
+        boundaries = _cluster([x for cell in table.cells for x in (cell[0], cell[2])])
+        if len(boundaries) < 2 or any(len(row.cells) != len(boundaries) - 1 for row in table.rows):
+            return None  # Merged or missing cells
+        return cls(boundaries)
+
+    def _row_boundaries(self, page):
+        """y positions of the horizontal rules that cross at least half the table width."""
+        width = self.right - self.left
+        coverage = {}
+        for edge in page.horizontal_edges:
+            overlap = min(edge['x1'], self.right) - max(edge['x0'], self.left)
+            if overlap > 0:
+                coverage.setdefault(edge['top'], 0)
+                coverage[edge['top']] += overlap
+
+        tops = _cluster(coverage)
+        totals = dict.fromkeys(tops, 0)
+        for top, overlap in coverage.items():
+            nearest = min(tops, key=lambda t: abs(t - top))
+            totals[nearest] += overlap
+        return [top for top in tops if totals[top] >= width / 2]
+
+    def _has_column_rules(self, page, top, bottom):
+        """True if every learned column boundary has a vertical rule on this page."""
+        xs = [edge['x0'] for edge in page.vertical_edges
+              if edge['bottom'] > top and edge['top'] < bottom]
+        return all(any(abs(x - boundary) <= SNAP_TOLERANCE for x in xs) for boundary in self.boundaries)
+
+    def extract_rows(self, page):
+        """
+        The page's table as a list of rows of cell text (header row included, like
+        page.extract_table()), or None if the page doesn't match this layout.
+        """
+        from pdfplumber.utils import extract_text
+
+        row_tops = self._row_boundaries(page)
+        if len(row_tops) < 2 or not self._has_column_rules(page, row_tops[0], row_tops[-1]):
+            return None
+
+        column_count = len(self.boundaries) - 1
+        cells = [[[] for _ in range(column_count)] for _ in range(len(row_tops) - 1)]
+        for char in page.chars:
+            v_mid = (char['top'] + char['bottom']) / 2
+            h_mid = (char['x0'] + char['x1']) / 2
+            row = bisect_right(row_tops, v_mid) - 1
+            col = bisect_right(self.boundaries, h_mid) - 1
+            if 0 <= row < len(cells) and 0 <= col < column_count:
+                cells[row][col].append(char)
+
+        return [[extract_text(chars) if chars else "" for chars in row] for row in cells]
+
+class LayoutTableExtractor:
+    """
+    Drop-in for page.extract_table() across the pages of one file: the table finder
+    runs until a page yields a ColumnLayout, after which pages are read through the
+    layout and only fall back to the table finder when they don't match it.
+    """
+    def __init__(self):
+        self.layout = None
+        self.fallbacks = 0
+
+    def extract_table(self, page):
+        if self.layout is not None:
+            rows = self.layout.extract_rows(page)
+            if rows is not None:
+                return rows
+            self.fallbacks += 1
+
+        table = page.find_table()
+        if table is None:
+            return None
+        if self.layout is None:
+            self.layout = ColumnLayout.from_table(table)
+        return table.extract()
@@ -1,17 +1,22 @@
 # pdf2excel.py
 
-import pdfplumber
-import pandas as pd
+# pandas, pdfplumber and openpyxl are imported inside the functions that use them, so
+# importing this module (GUI and CLI startup) doesn't pay for them until the first conversion.
 import os
 import re
 import logging
+import hashlib
 from datetime import datetime
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
 import time
-from unidecode import unidecode
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from quebec_regions_mapping import get_shore_region, get_custom_sector
+from accent_cache import strip_accents, accent_cache_info
+from extraction_cache import ExtractionCache, DEFAULT_CACHE_DIR
+from layout_extraction import LayoutTableExtractor
+from instrumentation import (
+    NULL_TIMER, StageTimer, Profiler, report_path_for, write_timing_report
+)
 
 def setup_logging():
     logs_dir = 'logs'
@@ -38,88 +43,455 @@ def has_cpp_in_centris_no(centris_no_text):
     text = str(centris_no_text).upper()
     return 'CPP' in text
 
-def extract_with_pdfplumber(pdf_path):
-    """Extracts rows from a PDF with columns [st, centris_no, municipality_borough, address, postal_code]."""
+EXTRACTED_COLUMNS = ['st', 'centris_no', 'municipality_borough', 'address', 'postal_code']
+
+# Bump whenever extraction output (or the page cache key) changes so stale extraction cache entries are ignored
+EXTRACTOR_VERSION = 2
+
+# 'table': pdfplumber's table finder on every page.
+# 'layout': learn the column boundaries once per file and bucket characters into
+# cells on later pages (see layout_extraction.py); falls back to the table finder.
+EXTRACTION_ENGINES = ('table', 'layout')
+
+def _extractor_version(engine):
+    """Cache version for an engine; 'table' keeps the original keys."""
+    if engine not in EXTRACTION_ENGINES:
+        raise ValueError(f"Unknown extraction engine {engine!r}; expected one of {EXTRACTION_ENGINES}")
+    return EXTRACTOR_VERSION if engine == 'table' else f"{EXTRACTOR_VERSION}-{engine}"
+
+def _normalize_table_rows(table):
+    """Turns one page's extracted table into 5-column rows, skipping the header row."""
+    rows = []
+    # table[0] might be a header row depending on the PDF format
+    # If so, we skip it with table[1:], but adapt as needed
+    for row in table[1:]:  # Skip the header row
+        # Join any split cells and clean up whitespace
+        cleaned_row = [' '.join(str(cell).split()) if cell else '' for cell in row]
+        # Filter out None/empty cells but keep the structure
+        if len(cleaned_row) >= 5:
+            # Take first 5 columns: ST, Centris No., Municipality/Borough, Address, Postal Code
+            rows.append(cleaned_row[:5])
+        elif len(cleaned_row) == 4:
+            # Handle case where ST column might be missing (backward compatibility)
+            # Insert empty ST at the beginning
+            rows.append([''] + cleaned_row[:4])
+        else:
+            logging.warning(f"Skipping malformed row: {cleaned_row}")
+    return rows
+
+def _object_digest(obj, object_digests, visiting):
+    """
+    SHA-256 digest of a PDF object with its indirect references resolved recursively
+    (streams by their decoded data and dictionary). object_digests memoizes indirect
+    objects by id, so fonts and forms shared by many pages are hashed once per file.
+    """
+    from pdfminer.pdftypes import PDFObjRef, PDFStream
+    
+    if isinstance(obj, PDFObjRef):
+        objid = obj.objid
+        if objid in object_digests:
+            return object_digests[objid]
+        if objid in visiting:
+            return f"ref {objid}".encode()  # Reference cycle
+        visiting.add(objid)
+        try:
+            digest = _object_digest(obj.resolve(), object_digests, visiting)
+        finally:
+            visiting.discard(objid)
+        object_digests[objid] = digest
+        return digest
+    
+    digest = hashlib.sha256(type(obj).__name__.encode())
+    if isinstance(obj, PDFStream):
+        digest.update(_object_digest(obj.attrs, object_digests, visiting))
+        digest.update(obj.get_data() or b'')  # Not get_rawdata(): it is dropped once decoded
+    elif isinstance(obj, dict):
+        for name in sorted(obj, key=str):
+            digest.update(repr(name).encode())
+            digest.update(_object_digest(obj[name], object_digests, visiting))
+    elif isinstance(obj, list):
+        for item in obj:
+            digest.update(_object_digest(item, object_digests, visiting))
+    else:
+        digest.update(repr(obj).encode())
+    return digest.digest()
+
+def page_content_hash(page, object_digests=None):
+    """
+    SHA-256 of a page's decoded content stream(s), its size and everything its
+    /Resources reference (fonts, Form XObjects and their own resources). Pages that
+    are carried over unchanged from one export to the next hash the same, and pages
+    whose content stream only invokes a different XObject (q /Fm0 Do Q) don't.
+    
+    object_digests can be shared across the pages of one file (see _object_digest()).
+    """
+    from pdfminer.pdftypes import resolve1
+    
+    if object_digests is None:
+        object_digests = {}
+    digest = hashlib.sha256(repr(page.bbox).encode())
+    contents = page.page_obj.contents
+    if not isinstance(contents, list):
+        contents = [contents]
+    for stream in contents:
+        stream = resolve1(stream)
+        if stream is not None:
+            digest.update(stream.get_data())
+    digest.update(_object_digest(page.page_obj.resources, object_digests, set()))
+    return digest.hexdigest()
+
+def _page_rows(page, page_cache=None, extract_table=None, version=EXTRACTOR_VERSION, object_digests=None):
+    """
+    Rows from one page, taken from the per-page cache when the page content is unchanged.
+    extract_table is the engine's page -> table callable (default: page.extract_table()).
+    """
+    if extract_table is None:
+        extract_table = lambda page: page.extract_table()
+    if page_cache is None:
+        table = extract_table(page)
+        return _normalize_table_rows(table) if table else []
+    
+    key = f"{page_content_hash(page, object_digests)}-v{version}"
+    columns = page_cache.get(key)
+    if columns is not None:
+        return [list(row) for row in zip(*columns)]
+    
+    table = extract_table(page)
+    rows = _normalize_table_rows(table) if table else []
+    page_cache.put(key, [list(col) for col in zip(*rows)], evict=False)
+    return rows
+
+def iter_rows(pdf_path, start=0, stop=None, page_cache_dir=None, engine='table'):
+    """
+    Yields cleaned 5-column rows [st, centris_no, municipality_borough, address, postal_code]
+    one page at a time, so only the current page's table is held in memory.
+    
+    With page_cache_dir, each page's rows are cached under a hash of its content stream,
+    so only new or changed pages of a PDF that grows between exports go through
+    page.extract_table().
+    
+    engine is one of EXTRACTION_ENGINES. With 'layout', the column boundaries are
+    learned from the first page with a table and reused for the remaining pages.
+    """
+    import pdfplumber
+    
+    version = _extractor_version(engine)
+    layout_extractor = LayoutTableExtractor() if engine == 'layout' else None
+    extract_table = layout_extractor.extract_table if layout_extractor else None
+    
+    page_cache = ExtractionCache(page_cache_dir) if page_cache_dir else None
+    object_digests = {}
     with pdfplumber.open(pdf_path) as pdf:
-        all_data = []
-        for page in pdf.pages:
-            table = page.extract_table()
-            if table:
-                # table[0] might be a header row depending on the PDF format
-                # If so, we skip it with table[1:], but adapt as needed
-                for row in table[1:]:  # Skip the header row
-                    # Join any split cells and clean up whitespace
-                    cleaned_row = [' '.join(str(cell).split()) if cell else '' for cell in row]
-                    # Filter out None/empty cells but keep the structure
-                    if len(cleaned_row) >= 5:
-                        # Take first 5 columns: ST, Centris No., Municipality/Borough, Address, Postal Code
-                        all_data.append(cleaned_row[:5])
-                    elif len(cleaned_row) == 4:
-                        # Handle case where ST column might be missing (backward compatibility)
-                        # Insert empty ST at the beginning
-                        all_data.append([''] + cleaned_row[:4])
-                    else:
-                        logging.warning(f"Skipping malformed row: {cleaned_row}")
-        return pd.DataFrame(all_data, columns=['st', 'centris_no', 'municipality_borough', 'address', 'postal_code'])
+        for page in pdf.pages[start:stop]:
+            yield from _page_rows(page, page_cache, extract_table, version, object_digests)
+    if page_cache is not None:
+        page_cache.evict()
+    if layout_extractor is not None and layout_extractor.fallbacks:
+        logging.info(f"{layout_extractor.fallbacks} page(s) of {pdf_path} didn't match the learned "
+                     f"column layout and went through the table finder")
 
-def extract_apartment(address):
-    """Extract apartment substring (e.g. 'Apt. 101') from an address. Returns (address_without_apt, apartment_text)."""
-    if not address:
-        return ("", None)
+def _extract_page_range(pdf_path, start, stop, page_cache_dir=None, engine='table'):
+    """Worker entry point: opens the PDF on its own and extracts rows from pages [start, stop)."""
+    return list(iter_rows(pdf_path, start, stop, page_cache_dir, engine))
+
+def extract_with_pdfplumber(pdf_path, page_workers=1, pages_per_chunk=None, page_cache_dir=None,
+                            engine='table'):
+    """
+    Extracts rows from a PDF with columns [st, centris_no, municipality_borough, address, postal_code].
     
-    apt_index = address.lower().find('apt.')
-    if apt_index == -1:
-        return address, None
-        
-    base_address = address[:apt_index].rstrip(' ,')
+    With page_workers > 1 the page range is split into chunks of pages_per_chunk pages
+    (default: one chunk per worker). Each worker process opens the file and extracts its
+    chunk, and the rows are joined back in page order.
     
-    postal_pattern = r'[A-Z][0-9][A-Z]\s*[0-9][A-Z][0-9]'
-    postal_match = re.search(postal_pattern, address[apt_index:])
+    page_cache_dir enables the per-page cache and engine picks the extractor (see iter_rows()).
+    With page_workers > 1 the 'layout' engine learns the column layout once per chunk.
+    """
+    import pandas as pd
+    import pdfplumber
     
-    if postal_match:
-        # Extract everything from 'apt.' up to the postal code
-        apartment = address[apt_index:apt_index + postal_match.start()].strip()
-        return base_address, apartment
-    else:
-        # If no postal code found, take the rest
-        apartment = address[apt_index:].strip()
-        return base_address, apartment
+    if not page_workers or page_workers <= 1:
+        return pd.DataFrame(_extract_page_range(pdf_path, 0, None, page_cache_dir, engine), columns=EXTRACTED_COLUMNS)
+    
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+    
+    if not pages_per_chunk:
+        pages_per_chunk = -(-page_count // page_workers)  # ceil division
+    chunks = [(start, min(start + pages_per_chunk, page_count))
+              for start in range(0, page_count, pages_per_chunk)]
+    
+    if len(chunks) <= 1:
+        return pd.DataFrame(_extract_page_range(pdf_path, 0, None, page_cache_dir, engine), columns=EXTRACTED_COLUMNS)
+    
+    logging.info(f"Extracting {page_count} pages from {pdf_path} in {len(chunks)} chunks "
+                 f"with {min(page_workers, len(chunks))} worker processes")
+    all_data = []
+    with ProcessPoolExecutor(max_workers=min(page_workers, len(chunks))) as executor:
+        # executor.map returns results in submission order, i.e. page order
+        for rows in executor.map(_extract_page_range, [pdf_path] * len(chunks),
+                                 [start for start, _ in chunks], [stop for _, stop in chunks],
+                                 [page_cache_dir] * len(chunks), [engine] * len(chunks)):
+            all_data.extend(rows)
+    return pd.DataFrame(all_data, columns=EXTRACTED_COLUMNS)
 
-def clean_text(text, extract_apt=False, remove_accents=False):
-    """Clean text, optionally remove accents, optionally handle apt extraction."""
-    if not text:
-        return ("", None) if extract_apt else ""
+def load_extracted_df(pdf_path, page_workers=1, use_cache=True, cache_dir=None, engine='table'):
+    """
+    extract_with_pdfplumber() backed by the on-disk extraction cache: a PDF whose bytes
+    were already extracted (by the same EXTRACTOR_VERSION and engine) is loaded without
+    pdfplumber. On a miss, unchanged pages are still served from the per-page cache.
+    """
+    import pandas as pd
+    
+    if not use_cache:
+        return extract_with_pdfplumber(pdf_path, page_workers=page_workers, engine=engine)
+    
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    cache = ExtractionCache(cache_dir)
+    key = cache.key_for(pdf_path, _extractor_version(engine))
+    columns = cache.get(key)
+    if columns is not None:
+        logging.info(f"Loaded extracted rows for {pdf_path} from cache")
+        return pd.DataFrame(dict(zip(EXTRACTED_COLUMNS, columns)), columns=EXTRACTED_COLUMNS)
+    
+    df = extract_with_pdfplumber(pdf_path, page_workers=page_workers,
+                                 page_cache_dir=os.path.join(cache_dir, 'pages'), engine=engine)
+    cache.put(key, [df[c].tolist() for c in EXTRACTED_COLUMNS] if not df.empty else [])
+    return df
+
+def _keep_status(st, centris_no):
+    """ST/CPP rule: keep all 'SO' (Sold) rows, and 'AC' (Active) rows only if they have CPP."""
+    return st == 'SO' or (st == 'AC' and has_cpp_in_centris_no(centris_no))
+
+def _clean_row_fields(row):
+    """Basic cleaning of the municipality / address fields of one row (see process_pdfs)."""
+    st, centris_no, municipality, address, postal_code = row
+    if municipality:
+        municipality = municipality.split('(')[0].strip()
+    if address:
+        address = address.strip()
+    if not (address and address.strip()):
+        address = f"{municipality} {address}"
+    return [st, centris_no, municipality, address, postal_code]
+
+def iter_filtered_rows(rows):
+    """
+    Streaming version of the ST/CPP filtering and basic cleaning done in process_pdfs().
+    Consumes rows from iter_rows() and yields the rows that survive, already cleaned.
+    
+    Old-format PDFs (no ST column) are only recognisable once every row has been seen,
+    so rows are buffered until the first non-empty ST value shows up. For current
+    exports that is the first row; for old-format files the buffer ends up holding
+    the whole file and is released unfiltered at the end, as in process_pdfs().
+    """
+    pending = []
+    has_status = False
+    kept = 0
+    for row in rows:
+        st = str(row[0]).strip().upper()
+        if st == 'NAN':
+            st = ''
+        row = [st] + list(row[1:])
+        
+        if not has_status:
+            if not st:
+                pending.append(row)
+                continue
+            # Rows with an empty ST never pass the SO/AC rule, so the buffer is dropped
+            has_status = True
+            pending = []
+        
+        if _keep_status(st, row[1]):
+            kept += 1
+            yield _clean_row_fields(row)
     
+    if not has_status and pending:
+        logging.warning(f"Old-format PDF detected (no ST column). Skipping ST/CPP filtering for {len(pending)} rows.")
+        for row in pending:
+            yield _clean_row_fields(row)
+    elif has_status:
+        logging.info(f"After ST/CPP filtering: {kept} rows remaining")
+
+class AddressNormalizer:
+    """
+    Address clean-up engine behind clean_text() and extract_apartment().
+    All regexes are compiled once; normalize_many() / split_many() run the rules
+    over a whole column so process_pdfs() doesn't go through them row by row.
+    """
     # Attempt to fix partial prefix typos (example usage scenario)
-    common_prefixes = {
+    COMMON_PREFIXES = {
         'ue ': 'Rue ',
         'v. ': 'Av. ',
         'h. ': 'Ch. ',
         'te ': 'Côte ',
         'l. ': 'Boul. '
     }
-    for wrong, correct in common_prefixes.items():
-        if text.lower().startswith(wrong):
-            text = correct + text[len(wrong):]
-            break
-    
-    # Remove text in parentheses (if needed)
-    cleaned = re.sub(r'\s*\(.*$', '', text)
-
-    if extract_apt:
-        cleaned, apartment = extract_apartment(cleaned)
-        # Clean trailing punctuation
-        cleaned = re.sub(r'[\s\-,]+(?<!E)(?<!O)\.?$', '', cleaned).strip()
+    
+    def __init__(self):
+        self.parentheses_pattern = re.compile(r'\s*\(.*$')
+        self.trailing_punctuation_pattern = re.compile(r'[\s\-,]+(?<!E)(?<!O)\.?$')
+        self.postal_pattern = re.compile(r'[A-Z][0-9][A-Z]\s*[0-9][A-Z][0-9]')
+    
+    def split_apartment(self, address):
+        """Extract apartment substring (e.g. 'Apt. 101') from an address. Returns (address_without_apt, apartment_text)."""
+        if not address:
+            return ("", None)
+        
+        apt_index = address.lower().find('apt.')
+        if apt_index == -1:
+            return address, None
+            
+        base_address = address[:apt_index].rstrip(' ,')
+        
+        postal_match = self.postal_pattern.search(address[apt_index:])
+        
+        if postal_match:
+            # Extract everything from 'apt.' up to the postal code
+            apartment = address[apt_index:apt_index + postal_match.start()].strip()
+            return base_address, apartment
+        else:
+            # If no postal code found, take the rest
+            apartment = address[apt_index:].strip()
+            return base_address, apartment
+    
+    def normalize(self, text, extract_apt=False, remove_accents=False):
+        """Clean text, optionally remove accents, optionally handle apt extraction."""
+        if not text:
+            return ("", None) if extract_apt else ""
+        
+        lowered = text.lower()
+        for wrong, correct in self.COMMON_PREFIXES.items():
+            if lowered.startswith(wrong):
+                text = correct + text[len(wrong):]
+                break
+        
+        # Remove text in parentheses (if needed)
+        cleaned = self.parentheses_pattern.sub('', text)
+        
+        if extract_apt:
+            cleaned, apartment = self.split_apartment(cleaned)
+            # Clean trailing punctuation
+            cleaned = self.trailing_punctuation_pattern.sub('', cleaned).strip()
+            if remove_accents:
+                cleaned = strip_accents(cleaned)
+                if apartment:
+                    apartment = strip_accents(apartment)
+            return cleaned, apartment
+        
+        cleaned = self.trailing_punctuation_pattern.sub('', cleaned).strip()
         if remove_accents:
-            cleaned = unidecode(cleaned)
-            if apartment:
-                apartment = unidecode(apartment)
-        return cleaned, apartment
+            cleaned = strip_accents(cleaned)
+        return cleaned
     
-    cleaned = re.sub(r'[\s\-,]+(?<!E)(?<!O)\.?$', '', cleaned).strip()
-    if remove_accents:
-        cleaned = unidecode(cleaned)
-    return cleaned
+    def normalize_many(self, addresses, extract_apt=False, remove_accents=False):
+        """
+        Batch version of normalize(). Returns parallel lists (cleaned_addresses, apartments);
+        apartments is all None when extract_apt is False.
+        """
+        if not extract_apt:
+            return [self.normalize(a, False, remove_accents) for a in addresses], [None] * len(addresses)
+        results = [self.normalize(a, True, remove_accents) for a in addresses]
+        return [r[0] for r in results], [r[1] for r in results]
+    
+    def split_many(self, addresses):
+        """Batch version of split_apartment(). Returns parallel lists (base_addresses, apartments)."""
+        results = [self.split_apartment(a) for a in addresses]
+        return [r[0] for r in results], [r[1] for r in results]
+
+# Shared instance so the patterns are only compiled once per process
+address_normalizer = AddressNormalizer()
+
+def extract_apartment(address):
+    """Extract apartment substring (e.g. 'Apt. 101') from an address. Returns (address_without_apt, apartment_text)."""
+    return address_normalizer.split_apartment(address)
+
+def clean_text(text, extract_apt=False, remove_accents=False):
+    """Clean text, optionally remove accents, optionally handle apt extraction."""
+    return address_normalizer.normalize(text, extract_apt=extract_apt, remove_accents=remove_accents)
+
+def _filter_and_clean_df(df):
+    """ST/CPP status filtering and basic municipality/address cleaning of an extracted DataFrame."""
+    # Filter based on ST (Status) column and CPP detection
+    if 'st' in df.columns and not df.empty:
+        # Clean ST column: strip whitespace and convert to uppercase for comparison
+        df['st'] = df['st'].astype(str).str.strip().str.upper()
+        
+        # Check if all ST values are empty or 'nan' (old-format PDF with 4 columns)
+        # This handles backward compatibility where empty strings were inserted for ST
+        # Replace 'nan' strings (from pandas NaN conversion) with empty strings for consistent checking
+        df['st'] = df['st'].replace('NAN', '')
+        all_st_empty = (df['st'] == '').all()
+        
+        if all_st_empty:
+            # Old-format PDF: skip ST filtering since status is unknown
+            # This prevents all rows from being filtered out when ST is empty
+            logging.warning(f"Old-format PDF detected (no ST column). Skipping ST/CPP filtering for {len(df)} rows.")
+        else:
+            # Filter: Include all 'SO' (Sold) rows, and 'AC' (Active) rows only if they have CPP
+            # Create mask for rows to keep
+            so_mask = df['st'] == 'SO'
+            # Same rule as has_cpp_in_centris_no(), vectorized over the column
+            has_cpp = df['centris_no'].fillna('').astype(str).str.upper().str.contains('CPP', regex=False)
+            ac_with_cpp_mask = (df['st'] == 'AC') & has_cpp
+            
+            # Apply filter
+            df = df[so_mask | ac_with_cpp_mask].copy()
+            # Reset index to avoid issues with iloc when addresses are unmerged
+            df = df.reset_index(drop=True)
+            
+            logging.info(f"After ST/CPP filtering: {len(df)} rows remaining")
+    elif 'st' not in df.columns:
+        logging.warning("ST column not found in extracted data. Skipping status filtering.")
+    
+    if df.empty:
+        return df  # Nothing left to clean (all rows filtered out)
+
+    # Basic cleaning of municipality / address columns (empty cells are left as they are)
+    municipality = df['municipality_borough']
+    df['municipality_borough'] = municipality.str.split('(', n=1).str[0].str.strip().where(
+        municipality.fillna('') != '', municipality
+    )
+    address = df['address']
+    df['address'] = address.str.strip().where(address.fillna('') != '', address)
+    
+    # If address is empty, sometimes the PDF merges them incorrectly
+    # This is a basic fallback example (may not be needed in all PDFs)
+    has_address = df['address'].fillna('').str.strip() != ''
+    df['address'] = df['address'].where(has_address, df['municipality_borough'] + ' ' + df['address'])
+    return df
+
+def _filter_by_branch(df, region_branch_ids, use_custom_sectors):
+    """
+    Keeps the rows whose city (or custom sector) maps to a branch and adds a 'Branch ID' column.
+    Each distinct city / (city, postal code) pair is looked up once, then the Branch IDs are
+    joined back onto the rows and filtered with a single mask.
+    """
+    import pandas as pd
+    
+    cities = df['municipality_borough']
+    if use_custom_sectors:
+        pairs = pd.MultiIndex.from_arrays([cities, df['postal_code']])
+        unique_pairs = pairs.unique()
+        sector_lookup = pd.Series(
+            [get_custom_sector(city, postal_code) for city, postal_code in unique_pairs],
+            index=unique_pairs, dtype=object
+        )
+        sectors = pd.Series(sector_lookup.reindex(pairs).to_numpy(), index=df.index)
+        keep_mask = sectors.notna() & sectors.isin(list(region_branch_ids))
+        branch_ids = sectors[keep_mask].map(region_branch_ids)
+    else:
+        default_branch = region_branch_ids.get('flyer_unknown', 'unknown')
+        unique_cities = cities.unique()
+        branch_lookup = pd.Series(
+            [region_branch_ids.get(f'flyer_{get_shore_region(city)}', default_branch) for city in unique_cities],
+            index=unique_cities, dtype=object
+        )
+        all_branch_ids = pd.Series(branch_lookup.reindex(cities).to_numpy(), index=df.index)
+        keep_mask = all_branch_ids != 'unknown'
+        branch_ids = all_branch_ids[keep_mask]
+    
+    filtered_df = df[keep_mask].reset_index(drop=True)
+    filtered_df['Branch ID'] = branch_ids.to_numpy()
+    return filtered_df
 
 def add_name_columns_to_df(df, merge_names, merged_name, column_names, default_values, remove_accents):
     """
@@ -142,7 +514,7 @@ def add_name_columns_to_df(df, merge_names, merged_name, column_names, default_v
             df[merged_name] = [default_full_name]*len(df)
         
         if remove_accents:
-            df[merged_name] = df[merged_name].astype(str).apply(lambda x: unidecode(x))
+            df[merged_name] = df[merged_name].astype(str).map(strip_accents)
         
         # Reorder columns so the merged_name is at the front
         cols = df.columns.tolist()
@@ -170,8 +542,8 @@ def add_name_columns_to_df(df, merge_names, merged_name, column_names, default_v
             df[col_last] = df[col_last].fillna(default_values.get(col_last, ""))
 
         if remove_accents:
-            df[col_first] = df[col_first].astype(str).apply(lambda x: unidecode(x))
-            df[col_last] = df[col_last].astype(str).apply(lambda x: unidecode(x))
+            df[col_first] = df[col_first].astype(str).map(strip_accents)
+            df[col_last] = df[col_last].astype(str).map(strip_accents)
         
         cols = df.columns.tolist()
         # Move the first/last name columns to the front
@@ -211,13 +583,36 @@ def process_pdfs(
     region_branch_ids=None, 
     use_custom_sectors=False, 
     remove_accents=False,
-    enable_logging=False
+    enable_logging=False,
+    page_workers=1,
+    streaming=False,
+    use_cache=True,
+    cache_dir=None,
+    engine='table',
+    timer=None
 ):
     """
     Main logic that processes PDF(s) and returns:
       - a list of DataFrames (all_dfs)
       - the final output directory (confirmed path)
+    
+    With streaming=True, rows are pulled page by page through iter_rows() and
+    iter_filtered_rows(), so only rows that survive the ST/CPP filter are kept
+    in memory instead of the whole extracted table.
+    
+    With use_cache=True (the default) extracted rows are cached on disk by PDF
+    content hash (see extraction_cache.py), so re-running the same PDF with
+    different column settings skips pdfplumber.
+    
+    engine selects the table extractor, see EXTRACTION_ENGINES.
+    
+    timer is an optional instrumentation.StageTimer that records each stage's
+    timings and row counts.
     """
+    import pandas as pd
+    
+    if timer is None:
+        timer = NULL_TIMER
     if output_dir is None:
         output_dir = os.getcwd()  # Default to current directory if none provided
     
@@ -244,72 +639,37 @@ def process_pdfs(
 
     for pdf_path in pdf_paths:
         logging.info(f"Processing PDF: {pdf_path}")
-        df = extract_with_pdfplumber(pdf_path)
-        logging.info(f"Extracted {len(df)} rows from {pdf_path}")
-
-        # Filter based on ST (Status) column and CPP detection
-        if 'st' in df.columns and not df.empty:
-            # Clean ST column: strip whitespace and convert to uppercase for comparison
-            df['st'] = df['st'].astype(str).str.strip().str.upper()
-            
-            # Check if all ST values are empty or 'nan' (old-format PDF with 4 columns)
-            # This handles backward compatibility where empty strings were inserted for ST
-            # Replace 'nan' strings (from pandas NaN conversion) with empty strings for consistent checking
-            df['st'] = df['st'].replace('NAN', '')
-            all_st_empty = (df['st'] == '').all()
-            
-            if all_st_empty:
-                # Old-format PDF: skip ST filtering since status is unknown
-                # This prevents all rows from being filtered out when ST is empty
-                logging.warning(f"Old-format PDF detected (no ST column). Skipping ST/CPP filtering for {len(df)} rows.")
-            else:
-                # Filter: Include all 'SO' (Sold) rows, and 'AC' (Active) rows only if they have CPP
-                # Create mask for rows to keep
-                so_mask = df['st'] == 'SO'
-                ac_with_cpp_mask = (df['st'] == 'AC') & df['centris_no'].apply(has_cpp_in_centris_no)
-                
-                # Apply filter
-                df = df[so_mask | ac_with_cpp_mask].copy()
-                # Reset index to avoid issues with iloc when addresses are unmerged
-                df = df.reset_index(drop=True)
-                
-                logging.info(f"After ST/CPP filtering: {len(df)} rows remaining")
-        elif 'st' not in df.columns:
-            logging.warning("ST column not found in extracted data. Skipping status filtering.")
-
-        # Basic cleaning of municipality / address columns
-        df['municipality_borough'] = df['municipality_borough'].apply(lambda x: x.split('(')[0].strip() if x else x)
-        df['address'] = df['address'].apply(lambda x: x.strip() if x else x)
-        
-        # If address is empty, sometimes the PDF merges them incorrectly
-        # This is a basic fallback example (may not be needed in all PDFs)
-        df['address'] = df.apply(
-            lambda row: row['address'] if row['address'] and row['address'].strip()
-            else f"{row['municipality_borough']} {row['address']}",
-            axis=1
-        )
+        timer.current_pdf = pdf_path
+        if streaming:
+            # Cache hits are streamed from the cached table; misses are not stored,
+            # since that would mean holding the whole file again
+            with timer.stage('extract_filter') as stage:
+                cached = None
+                if use_cache:
+                    cache = ExtractionCache(cache_dir or DEFAULT_CACHE_DIR)
+                    cached = cache.get(cache.key_for(pdf_path, _extractor_version(engine)))
+                rows = zip(*cached) if cached is not None else iter_rows(pdf_path, engine=engine)
+                df = pd.DataFrame(iter_filtered_rows(rows), columns=EXTRACTED_COLUMNS)
+                stage.rows_out = len(df)
+            logging.info(f"Streamed {len(df)} rows from {pdf_path} after ST/CPP filtering")
+        else:
+            with timer.stage('extract') as stage:
+                df = load_extracted_df(pdf_path, page_workers=page_workers, use_cache=use_cache,
+                                       cache_dir=cache_dir, engine=engine)
+                stage.rows_in = stage.rows_out = len(df)  # rows_in counts table rows read from the PDF
+            logging.info(f"Extracted {len(df)} rows from {pdf_path}")
+            with timer.stage('st_filter', rows_in=len(df)) as stage:
+                df = _filter_and_clean_df(df)
+                stage.rows_out = len(df)
 
         # Optional region filtering
         if filter_by_region or use_custom_sectors:
-            filtered_df = pd.DataFrame(columns=df.columns)
-            for _, row in df.iterrows():
-                city = row['municipality_borough']
-                if use_custom_sectors:
-                    sector = get_custom_sector(city, row['postal_code'])
-                    if sector and sector in region_branch_ids:
-                        row_df = pd.DataFrame([row])
-                        row_df['Branch ID'] = region_branch_ids[sector]
-                        filtered_df = pd.concat([filtered_df, row_df], ignore_index=True)
-                else:
-                    region = get_shore_region(city)
-                    branch_id = region_branch_ids.get(f'flyer_{region}', region_branch_ids.get('flyer_unknown', 'unknown'))
-                    if branch_id != 'unknown':
-                        row_df = pd.DataFrame([row])
-                        row_df['Branch ID'] = branch_id
-                        filtered_df = pd.concat([filtered_df, row_df], ignore_index=True)
+            with timer.stage('region_map', rows_in=len(df)) as stage:
+                filtered_df = _filter_by_branch(df, region_branch_ids, use_custom_sectors)
+                stage.rows_out = len(filtered_df)
             
             if len(filtered_df) > 0:
-                df = filtered_df.copy()
+                df = filtered_df
             else:
                 logging.error("No valid rows after region filtering.")
                 all_dfs.append(pd.DataFrame())
@@ -318,173 +678,170 @@ def process_pdfs(
         # Build final output DataFrame
         output_df_final = None
 
-        # (A) If MERGE_ADDRESS is True
-        if merge_address:
-            merged_addresses = []
-            apartments = []
-            branch_ids = []
-            valid_indices = []
+        addresses = df['address'].tolist()
+        cities = df['municipality_borough'].tolist()
+        postal_codes = df['postal_code'].tolist()
+        
+        # Apartment detection always looks at the raw address; the cleaned address
+        # comes from the same engine call for both branches below
+        with timer.stage('clean', rows_in=len(addresses)) as stage:
+            if should_extract_apartment and not merge_address:
+                cleaned_addresses, apartments = address_normalizer.normalize_many(
+                    addresses, extract_apt=True, remove_accents=remove_accents
+                )
+            elif should_extract_apartment or filter_apartments:
+                base_addresses, apartments = address_normalizer.split_many(addresses)
+            else:
+                apartments = [None] * len(addresses)
+            if not should_extract_apartment:
+                cleaned_addresses, _ = address_normalizer.normalize_many(
+                    addresses, extract_apt=False, remove_accents=remove_accents
+                )
+            stage.rows_out = len(apartments)
+        
+        with timer.stage('build_output', rows_in=len(df)) as stage:
+            # (A) If MERGE_ADDRESS is True
+            if merge_address:
+                merged_addresses = []
+                seen_addresses = set()  # O(1) membership test; merged_addresses keeps first-occurrence order
+                valid_indices = []
 
-            for idx, row in df.iterrows():
-                if should_extract_apartment:
-                    clean_addr, apt = extract_apartment(row['address'])
+                for idx, (address, city, postal_code, apt) in enumerate(zip(addresses, cities, postal_codes, apartments)):
                     if filter_apartments and apt is not None:
-                        logging.info(f"Filtering out address with apartment: {row['address']} (apt={apt})")
+                        if should_extract_apartment:
+                            logging.info(f"Filtering out address with apartment: {address} (apt={apt})")
+                        else:
+                            logging.info(f"Filtering out address with apartment: {address}")
                         continue
-                    address_parts = [
-                        clean_addr.strip() if clean_addr else "",
-                        row['municipality_borough'].strip() if row['municipality_borough'] else "",
-                        province_default,
-                        row['postal_code']
-                    ]
-                    merged_address = address_separator.join(filter(None, address_parts))
-                    merged_address = merged_address.strip()
-                    
-                    # Avoid duplicates in the final list
-                    if merged_address not in merged_addresses:
-                        merged_addresses.append(merged_address)
-                        if 'Branch ID' in row:
-                            branch_ids.append(row['Branch ID'])
-                        if include_apartment_column and not filter_apartments:
-                            apartments.append(apt)
-                        valid_indices.append(idx)
-                else:
-                    if filter_apartments:
-                        _, apt = extract_apartment(row['address'])
-                        if apt is not None:
-                            logging.info(f"Filtering out address with apartment: {row['address']}")
-                            continue
-                    plain_addr = clean_text(row['address'], extract_apt=False, remove_accents=remove_accents)
-                    address_parts = [
-                        plain_addr,
-                        row['municipality_borough'],
-                        province_default,
-                        row['postal_code']
-                    ]
+                
+                    if should_extract_apartment:
+                        clean_addr = base_addresses[idx]
+                        address_parts = [
+                            clean_addr.strip() if clean_addr else "",
+                            city.strip() if city else "",
+                            province_default,
+                            postal_code
+                        ]
+                    else:
+                        address_parts = [
+                            cleaned_addresses[idx],
+                            city,
+                            province_default,
+                            postal_code
+                        ]
                     merged_address = address_separator.join(filter(None, address_parts)).strip()
-                    
-                    if merged_address not in merged_addresses:
+                
+                    # Avoid duplicates in the final list
+                    if merged_address not in seen_addresses:
+                        seen_addresses.add(merged_address)
                         merged_addresses.append(merged_address)
-                        if 'Branch ID' in row:
-                            branch_ids.append(row['Branch ID'])
                         valid_indices.append(idx)
             
-            if valid_indices:
-                df_filtered = df.loc[valid_indices].copy()
-                base_length = len(df_filtered)
+                if valid_indices:
+                    df_filtered = df.iloc[valid_indices]
                 
-                output_data = {}
-                if 'Branch ID' in df_filtered.columns:
-                    output_data['Branch ID'] = df_filtered['Branch ID'].tolist()
-                elif branch_ids:
-                    output_data['Branch ID'] = branch_ids[:base_length]
-                
-                # Remove accents if needed
-                cleaned_merged_addresses = []
-                for addr in merged_addresses[:base_length]:
-                    cleaned_merged_addresses.append(unidecode(addr) if remove_accents else addr)
+                    output_data = {}
+                    if 'Branch ID' in df_filtered.columns:
+                        output_data['Branch ID'] = df_filtered['Branch ID'].tolist()
                 
-                output_data[merged_address_name] = cleaned_merged_addresses
+                    # Remove accents if needed
+                    output_data[merged_address_name] = (
+                        [strip_accents(addr) for addr in merged_addresses] if remove_accents else merged_addresses
+                    )
 
-                partial_df = pd.DataFrame(output_data)
-                output_df_final = partial_df
-            else:
-                output_df_final = pd.DataFrame()
+                    partial_df = pd.DataFrame(output_data)
+                    output_df_final = partial_df
+                else:
+                    output_df_final = pd.DataFrame()
         
-        # (B) If MERGE_ADDRESS is False
-        else:
-            valid_indices = []
-            cleaned_addresses = []
-            apartments = []
+            # (B) If MERGE_ADDRESS is False
+            else:
+                valid_indices = []
+                kept_addresses = []
+                kept_apartments = []
 
-            for idx, row in df.iterrows():
-                if should_extract_apartment:
-                    clean_addr, apt = clean_text(row['address'], extract_apt=True, remove_accents=remove_accents)
+                for idx, (address, apt) in enumerate(zip(addresses, apartments)):
                     if filter_apartments and apt is not None:
-                        logging.info(f"Filtering out address with apartment: {row['address']}")
+                        logging.info(f"Filtering out address with apartment: {address}")
                         continue
-                    cleaned_addresses.append(clean_addr)
-                    if include_apartment_column and not filter_apartments:
-                        apartments.append(apt)
-                    valid_indices.append(idx)
-                else:
-                    if filter_apartments:
-                        _, apt = extract_apartment(row['address'])
-                        if apt is not None:
-                            logging.info(f"Filtering out address with apartment: {row['address']}")
-                            continue
-                    plain_addr = clean_text(row['address'], extract_apt=False, remove_accents=remove_accents)
-                    cleaned_addresses.append(plain_addr)
+                    kept_addresses.append(cleaned_addresses[idx])
+                    kept_apartments.append(apt)
                     valid_indices.append(idx)
             
-            df_filtered = df.loc[valid_indices].copy()
-            output_data = {}
+                df_filtered = df.iloc[valid_indices]
+                output_data = {}
             
-            # Build columns
-            output_data[column_names['Address']] = cleaned_addresses
-            output_data[column_names['City']] = df_filtered['municipality_borough'].tolist()
-            output_data[column_names['Province']] = [
-                default_values.get(column_names['Province'], province_default)
-            ] * len(df_filtered)
-            output_data[column_names['Postal Code']] = df_filtered['postal_code'].tolist()
+                # Build columns
+                output_data[column_names['Address']] = kept_addresses
+                output_data[column_names['City']] = df_filtered['municipality_borough'].tolist()
+                output_data[column_names['Province']] = [
+                    default_values.get(column_names['Province'], province_default)
+                ] * len(df_filtered)
+                output_data[column_names['Postal Code']] = df_filtered['postal_code'].tolist()
             
-            # If Branch ID was added
-            if 'Branch ID' in df_filtered.columns:
-                output_data['Branch ID'] = df_filtered['Branch ID'].tolist()
+                # If Branch ID was added
+                if 'Branch ID' in df_filtered.columns:
+                    output_data['Branch ID'] = df_filtered['Branch ID'].tolist()
 
-            if include_apartment_column and not filter_apartments and should_extract_apartment:
-                output_data[apartment_column_name] = apartments
+                if include_apartment_column and not filter_apartments and should_extract_apartment:
+                    output_data[apartment_column_name] = kept_apartments
             
-            partial_df = pd.DataFrame(output_data)
-
-            # If address starts with the city name, remove duplication:
-            address_col = column_names['Address']
-            city_col = column_names['City']
-            if address_col in partial_df.columns and city_col in partial_df.columns:
-                partial_df[address_col] = partial_df.apply(
-                    lambda row: row[address_col].replace(row[city_col], '', 1).strip()
-                    if row[address_col].startswith(row[city_col]) else row[address_col],
-                    axis=1
-                )
+                partial_df = pd.DataFrame(output_data)
+
+                # If address starts with the city name, remove duplication:
+                address_col = column_names['Address']
+                city_col = column_names['City']
+                if address_col in partial_df.columns and city_col in partial_df.columns and not partial_df.empty:
+                    partial_df[address_col] = partial_df.apply(
+                        lambda row: row[address_col].replace(row[city_col], '', 1).strip()
+                        if row[address_col].startswith(row[city_col]) else row[address_col],
+                        axis=1
+                    )
             
-            output_df_final = partial_df
+                output_df_final = partial_df
+        
+            stage.rows_out = len(output_df_final)
         
         # Add name columns if we have a valid DF
         if output_df_final is not None and not output_df_final.empty:
-            output_df_final = add_name_columns_to_df(
-                df=output_df_final,
-                merge_names=merge_names,
-                merged_name=merged_name,
-                column_names=column_names,
-                default_values=default_values,
-                remove_accents=remove_accents
-            )
-
-            # Phone column
-            if include_phone:
-                phone_col = column_names.get('Phone', 'Phone')
-                output_df_final[phone_col] = [phone_default]*len(output_df_final)
-            
-            # Date column
-            if include_date:
-                date_col = column_names.get('Date', 'Date')
-                output_df_final[date_col] = [date_value]*len(output_df_final)
+            with timer.stage('name_columns', rows_in=len(output_df_final)) as stage:
+                output_df_final = add_name_columns_to_df(
+                    df=output_df_final,
+                    merge_names=merge_names,
+                    merged_name=merged_name,
+                    column_names=column_names,
+                    default_values=default_values,
+                    remove_accents=remove_accents
+                )
+
+                # Phone column
+                if include_phone:
+                    phone_col = column_names.get('Phone', 'Phone')
+                    output_df_final[phone_col] = [phone_default]*len(output_df_final)
+                
+                # Date column
+                if include_date:
+                    date_col = column_names.get('Date', 'Date')
+                    output_df_final[date_col] = [date_value]*len(output_df_final)
+                stage.rows_out = len(output_df_final)
 
             # Sort final
-            if filter_by_region and 'Branch ID' in output_df_final.columns:
-                sort_columns = ['Branch ID']
-                if merge_address and merged_address_name in output_df_final.columns:
-                    sort_columns.append(merged_address_name)
+            with timer.stage('sort', rows_in=len(output_df_final)) as stage:
+                if filter_by_region and 'Branch ID' in output_df_final.columns:
+                    sort_columns = ['Branch ID']
+                    if merge_address and merged_address_name in output_df_final.columns:
+                        sort_columns.append(merged_address_name)
+                    else:
+                        if column_names['City'] in output_df_final.columns:
+                            sort_columns.append(column_names['City'])
+                        if column_names['Address'] in output_df_final.columns:
+                            sort_columns.append(column_names['Address'])
+                    output_df_final = output_df_final.sort_values(sort_columns)
                 else:
-                    if column_names['City'] in output_df_final.columns:
-                        sort_columns.append(column_names['City'])
-                    if column_names['Address'] in output_df_final.columns:
-                        sort_columns.append(column_names['Address'])
-                output_df_final = output_df_final.sort_values(sort_columns)
-            else:
-                sort_col = merged_address_name if merge_address else column_names.get('City')
-                if sort_col and sort_col in output_df_final.columns:
-                    output_df_final = output_df_final.sort_values(by=sort_col)
+                    sort_col = merged_address_name if merge_address else column_names.get('City')
+                    if sort_col and sort_col in output_df_final.columns:
+                        output_df_final = output_df_final.sort_values(by=sort_col)
+                stage.rows_out = len(output_df_final)
         else:
             output_df_final = pd.DataFrame()
 
@@ -492,6 +849,51 @@ def process_pdfs(
 
     return all_dfs, output_dir
 
+def _init_worker_logging(log_files):
+    """Point a worker process's root logger at the parent's log file(s)."""
+    if logging.getLogger().handlers or not log_files:
+        return  # Forked workers already inherit the parent's handlers
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.FileHandler(f) for f in log_files]
+    )
+
+def _process_single_pdf(pdf_path, options, timing=False):
+    """
+    Worker entry point: run process_pdfs() on one PDF (module-level so it can be pickled).
+    Returns (dfs, output_dir, stage_records); stage_records is empty unless timing is on.
+    """
+    timer = StageTimer() if timing else None
+    dfs, output_dir = process_pdfs([pdf_path], timer=timer, **options)
+    return dfs, output_dir, timer.records if timer else []
+
+def _iter_processed_pdfs(pdf_paths, options, workers=1, timing=False):
+    """
+    Yields (index, (dfs, output_dir, stage_records)) for each PDF as it finishes.
+    Runs serially when workers <= 1, otherwise in a ProcessPoolExecutor.
+    """
+    if not workers or workers <= 1 or len(pdf_paths) <= 1:
+        for i, pdf_path in enumerate(pdf_paths):
+            yield i, _process_single_pdf(pdf_path, options, timing)
+        return
+    
+    log_files = []
+    if options.get('enable_logging'):
+        log_files = [h.baseFilename for h in logging.getLogger().handlers
+                     if isinstance(h, logging.FileHandler)]
+    
+    max_workers = min(workers, len(pdf_paths))
+    logging.info(f"Processing {len(pdf_paths)} PDFs with {max_workers} worker processes")
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker_logging,
+                             initargs=(log_files,)) as executor:
+        futures = {
+            executor.submit(_process_single_pdf, pdf_path, options, timing): i
+            for i, pdf_path in enumerate(pdf_paths)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
 def auto_adjust_columns(filename, df=None):
     """Auto-adjust column widths for Excel or format CSV content if needed."""
     from openpyxl import load_workbook
@@ -520,15 +922,158 @@ def auto_adjust_columns(filename, df=None):
         formatted_df = df.copy()
         max_lengths = {}
         for c in formatted_df.columns:
-            max_lengths[c] = max(
-                formatted_df[c].astype(str).str.len().max(),
-                len(str(c))
-            )
+            col_max = formatted_df[c].astype(str).str.len().max()
+            # Missing values stay NaN under astype(str) in pandas 3, which makes the max a float
+            max_lengths[c] = max(int(col_max) if col_max == col_max else 0, len(str(c)))
         for c in formatted_df.columns:
             width = max_lengths[c]
             formatted_df[c] = formatted_df[c].astype(str).str.ljust(width)
         return formatted_df
 
+def _excel_column_widths(df):
+    """
+    Column widths computed from the DataFrame itself, using the same rule as
+    auto_adjust_columns(): longest text value in the column (header included),
+    (max_length + 2) * 1.2. Non-text cells don't count, as before.
+    """
+    import pandas as pd
+    
+    widths = []
+    for c in df.columns:
+        max_length = len(c) if isinstance(c, str) else 0
+        try:
+            col_max = df[c].str.len().max()
+        except AttributeError:
+            col_max = None  # Not a text column
+        if pd.notna(col_max):
+            max_length = max(max_length, int(col_max))
+        widths.append((max_length + 2) * 1.2)
+    return widths
+
+def write_excel(df, filename, sheet_name='Sheet1'):
+    """
+    Writes df to an .xlsx file in a single pass with openpyxl's write-only mode.
+    Column widths come from the DataFrame, so there is no to_excel() + reload + resave
+    round-trip as with auto_adjust_columns().
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+    from openpyxl.utils import get_column_letter
+    
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    
+    for i, width in enumerate(_excel_column_widths(df), start=1):
+        worksheet.column_dimensions[get_column_letter(i)].width = width
+    
+    # Same bold, boxed header that DataFrame.to_excel() writes (pandas 1.x/2.x)
+    thin = Side(style='thin')
+    header_font = Font(bold=True)
+    header_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    header_alignment = Alignment(horizontal='center', vertical='top')
+    header = []
+    for c in df.columns:
+        cell = WriteOnlyCell(worksheet, value=c)
+        cell.font = header_font
+        cell.border = header_border
+        cell.alignment = header_alignment
+        header.append(cell)
+    worksheet.append(header)
+    
+    # Missing values become empty cells
+    values = df.astype(object).where(df.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        worksheet.append(row)
+    
+    workbook.save(filename)
+
+CSV_CHUNK_ROWS = 50000
+
+def _csv_column_widths(df):
+    """Padding widths, same rule as auto_adjust_columns(): longest value or header."""
+    widths = []
+    for c in df.columns:
+        col_max = df[c].astype(str).str.len().max()
+        widths.append(max(int(col_max) if col_max == col_max else 0, len(str(c))))
+    return widths
+
+def write_csv(df, filename, pad=False, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Writes df to a UTF-8 (with BOM) CSV in chunks of chunk_rows rows, so only one
+    chunk is formatted at a time instead of a full padded copy of df.
+    pad=True left-justifies every column to its widest value, as auto_adjust_columns()
+    did; it is cosmetic and makes the file larger, so it is off by default.
+    """
+    import pandas as pd
+    
+    widths = _csv_column_widths(df) if pad else None
+    with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+        for start in range(0, max(len(df), 1), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            if pad:
+                chunk = pd.DataFrame(
+                    {i: chunk.iloc[:, i].astype(str).str.ljust(width) for i, width in enumerate(widths)}
+                )
+                chunk.columns = df.columns
+            chunk.to_csv(f, header=start == 0, index=False)
+
+OUTPUT_FORMATS = ('xlsx', 'csv', 'parquet', 'feather')
+COLUMNAR_FORMATS = ('parquet', 'feather')
+
+def _require_pyarrow(file_format):
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            f"{file_format} output requires the optional pyarrow package (pip install pyarrow)"
+        ) from e
+    return pyarrow
+
+def write_columnar(df, filename, file_format='parquet', compression='zstd'):
+    """
+    Writes df as Parquet or Feather (Arrow IPC) with typed columns and compression,
+    so downstream jobs can load it without parsing or stripping CSV padding.
+    Requires the optional pyarrow package.
+    """
+    pa = _require_pyarrow(file_format)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, filename, compression=compression)
+    elif file_format == 'feather':
+        import pyarrow.feather as feather
+        feather.write_feather(table, filename, compression=compression)
+    else:
+        raise ValueError(f"Unknown columnar format {file_format!r}; expected one of {COLUMNAR_FORMATS}")
+
+def _write_output(df, filename, file_format, pad_csv=False):
+    """Writes the final DataFrame in the requested file_format."""
+    if file_format == 'xlsx':
+        write_excel(df, filename)
+    elif file_format in COLUMNAR_FORMATS:
+        write_columnar(df, filename, file_format)
+    else:
+        write_csv(df, filename, pad=pad_csv)
+
+def _format_date_column(dates, file_format):
+    """YYYY-MM-DD text for xlsx/csv; a real date column for the typed columnar formats."""
+    import pandas as pd
+    
+    dates = pd.to_datetime(dates)
+    return dates.dt.date if file_format in COLUMNAR_FORMATS else dates.dt.strftime('%Y-%m-%d')
+
+def _write_run_report(output_filename, records, process_options, workers, profiler=None):
+    """Writes the timing report (and the profile, if any) next to output_filename."""
+    profile_file = None
+    if profiler:
+        profiler.stop()
+        profile_file = profiler.save(output_filename)
+    options = {k: v for k, v in process_options.items() if k not in ('column_names', 'default_values', 'region_branch_ids')}
+    options['workers'] = workers
+    write_timing_report(report_path_for(output_filename), records, output_file=output_filename,
+                        options=options, profile_file=profile_file)
+
 def convert_pdf_to_excel(
     pdf_files,
     output_dir,
@@ -555,12 +1100,47 @@ def convert_pdf_to_excel(
     filter_by_region=False,
     region_branch_ids=None,
     use_custom_sectors=False,
-    remove_accents=False
+    remove_accents=False,
+    workers=1,
+    page_workers=1,
+    streaming=False,
+    use_cache=True,
+    cache_dir=None,
+    engine='table',
+    pad_csv=False,
+    timing_report=False,
+    profile=None
 ):
     """
     High-level function that calls process_pdfs() and then writes outputs.
     Yields progress (int) or the final filename (str).
+    
+    With workers > 1, PDFs are extracted and cleaned in a process pool; results
+    are still merged in input order so the output is identical to a serial run.
+    page_workers > 1 additionally splits each PDF's pages across worker processes,
+    which helps when a single very large PDF dominates the batch.
+    use_cache / cache_dir control the on-disk extraction cache used by process_pdfs().
+    engine='layout' switches to the faster fixed-layout extractor (see EXTRACTION_ENGINES).
+    file_format is one of OUTPUT_FORMATS; 'parquet' and 'feather' need pyarrow.
+    CSV is written unpadded unless pad_csv=True (see write_csv()).
+    
+    With timing_report=True, per-stage wall/CPU time, row counts and memory deltas
+    are written as JSON next to each output file (foo.xlsx -> foo.timing.json).
+    profile='cprofile' or 'pyinstrument' also profiles the run in this process
+    and saves the profile beside the report.
     """
+    import pandas as pd
+    
+    if file_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown file_format {file_format!r}; expected one of {OUTPUT_FORMATS}")
+    if file_format in COLUMNAR_FORMATS:
+        _require_pyarrow(file_format)  # Fail before extracting anything
+    
+    profiler = Profiler(profile) if profile else None
+    if profiler:
+        profiler.start()
+    timing_report = timing_report or profiler is not None
+    
     if enable_logging:
         logging.info(f"Starting conversion with output_dir={output_dir}")
         logging.info(f"Absolute output_dir path: {os.path.abspath(output_dir)}")
@@ -578,36 +1158,53 @@ def convert_pdf_to_excel(
     all_unique_addresses = set()
     all_data = []
     
-    for i, pdf_path in enumerate(pdf_paths):
-        # Extract dataframes from each PDF
-        dfs, confirmed_output_dir = process_pdfs(
-            [pdf_path],
-            column_names=column_names,
-            merge_names=merge_names,
-            merged_name=merged_name,
-            default_values=default_values,
-            file_format=file_format,
-            output_dir=output_dir,  # we pass the user-chosen directory here
-            custom_filename=custom_filename,
-            merge_address=merge_address,
-            merged_address_name=merged_address_name,
-            address_separator=address_separator,
-            province_default=province_default,
-            should_extract_apartment=should_extract_apartment,
-            apartment_column_name=apartment_column_name,
-            filter_apartments=filter_apartments,
-            include_apartment_column=include_apartment_column,
-            include_phone=include_phone,
-            phone_default=phone_default,
-            include_date=include_date,
-            date_value=date_value,
-            filter_by_region=filter_by_region,
-            region_branch_ids=region_branch_ids,
-            use_custom_sectors=use_custom_sectors,
-            remove_accents=remove_accents,
-            enable_logging=enable_logging
-        )
+    process_options = dict(
+        column_names=column_names,
+        merge_names=merge_names,
+        merged_name=merged_name,
+        default_values=default_values,
+        file_format=file_format,
+        output_dir=output_dir,  # we pass the user-chosen directory here
+        custom_filename=custom_filename,
+        merge_address=merge_address,
+        merged_address_name=merged_address_name,
+        address_separator=address_separator,
+        province_default=province_default,
+        should_extract_apartment=should_extract_apartment,
+        apartment_column_name=apartment_column_name,
+        filter_apartments=filter_apartments,
+        include_apartment_column=include_apartment_column,
+        include_phone=include_phone,
+        phone_default=phone_default,
+        include_date=include_date,
+        date_value=date_value,
+        filter_by_region=filter_by_region,
+        region_branch_ids=region_branch_ids,
+        use_custom_sectors=use_custom_sectors,
+        remove_accents=remove_accents,
+        enable_logging=enable_logging,
+        page_workers=page_workers,
+        streaming=streaming,
+        use_cache=use_cache,
+        cache_dir=cache_dir,
+        engine=engine
+    )
+    
+    # Extract dataframes from each PDF, one PDF per task. Results are stored by
+    # input position so the merge below sees them in the original order no
+    # matter which worker finishes first.
+    results = [None] * total_files
+    for completed, (i, result) in enumerate(
+        _iter_processed_pdfs(pdf_paths, process_options, workers, timing=timing_report), start=1
+    ):
+        results[i] = result
         
+        # Emit progress up to ~90% across the loop
+        progress = int(completed / total_files * 90)
+        yield progress
+    
+    timer = StageTimer() if timing_report else NULL_TIMER
+    for dfs, confirmed_output_dir, _ in results:
         # Either we are merging all into a single final file or separate outputs
         if merge_files:
             for df in dfs:
@@ -623,10 +1220,6 @@ def convert_pdf_to_excel(
         else:
             # If not merging, we just store each PDF's data in all_data
             all_data.extend(dfs)
-        
-        # Emit progress up to ~90% across the loop
-        progress = int((i + 1) / total_files * 90)
-        yield progress
 
     # After processing all PDFs, either write a single merged file or multiple files
     current_time = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
@@ -634,34 +1227,39 @@ def convert_pdf_to_excel(
 
     if merge_files:
         if all_data:
-            merged_df = pd.concat(all_data, ignore_index=True)
+            for _, _, stage_records in results:
+                timer.extend(stage_records)
+            timer.current_pdf = None
+            with timer.stage('merge', rows_in=sum(len(d) for d in all_data)) as stage:
+                merged_df = pd.concat(all_data, ignore_index=True)
             
-            # Format date column if it exists
-            if include_date and 'Date' in merged_df.columns:
-                merged_df['Date'] = pd.to_datetime(merged_df['Date']).dt.strftime('%Y-%m-%d')
+                # Format date column if it exists
+                if include_date and 'Date' in merged_df.columns:
+                    merged_df['Date'] = _format_date_column(merged_df['Date'], file_format)
             
-            # Drop apartment column if it was only used internally
-            if should_extract_apartment and not include_apartment_column and apartment_column_name in merged_df.columns:
-                merged_df.drop(columns=[apartment_column_name], inplace=True, errors='ignore')
-
-            # If filtering by region, sort by region + city/address
-            if filter_by_region and 'Branch ID' in merged_df.columns:
-                sort_cols = ['Branch ID']
-                if merge_address and merged_address_name in merged_df.columns:
-                    sort_cols.append(merged_address_name)
+                # Drop apartment column if it was only used internally
+                if should_extract_apartment and not include_apartment_column and apartment_column_name in merged_df.columns:
+                    merged_df.drop(columns=[apartment_column_name], inplace=True, errors='ignore')
+
+                # If filtering by region, sort by region + city/address
+                if filter_by_region and 'Branch ID' in merged_df.columns:
+                    sort_cols = ['Branch ID']
+                    if merge_address and merged_address_name in merged_df.columns:
+                        sort_cols.append(merged_address_name)
+                    else:
+                        city_col = column_names.get('City')
+                        addr_col = column_names.get('Address')
+                        if city_col and city_col in merged_df.columns:
+                            sort_cols.append(city_col)
+                        if addr_col and addr_col in merged_df.columns:
+                            sort_cols.append(addr_col)
+                    merged_df = merged_df.sort_values(sort_cols)
                 else:
-                    city_col = column_names.get('City')
-                    addr_col = column_names.get('Address')
-                    if city_col and city_col in merged_df.columns:
-                        sort_cols.append(city_col)
-                    if addr_col and addr_col in merged_df.columns:
-                        sort_cols.append(addr_col)
-                merged_df = merged_df.sort_values(sort_cols)
-            else:
-                # Otherwise just sort by city or merged_address
-                sort_col = merged_address_name if merge_address else column_names.get('City')
-                if sort_col and sort_col in merged_df.columns:
-                    merged_df = merged_df.sort_values(by=sort_col)
+                    # Otherwise just sort by city or merged_address
+                    sort_col = merged_address_name if merge_address else column_names.get('City')
+                    if sort_col and sort_col in merged_df.columns:
+                        merged_df = merged_df.sort_values(by=sort_col)
+                stage.rows_out = len(merged_df)
 
             if custom_filename:
                 output_filename = os.path.join(confirmed_output_dir, f'{custom_filename}.{file_format}')
@@ -669,12 +1267,12 @@ def convert_pdf_to_excel(
                 output_filename = os.path.join(confirmed_output_dir, f'merged_output_{current_time}.{file_format}')
 
             # Save
-            if file_format == 'xlsx':
-                merged_df.to_excel(output_filename, index=False)
-                auto_adjust_columns(output_filename)
-            else:
-                formatted_df = auto_adjust_columns(output_filename, merged_df)
-                formatted_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
+            with timer.stage('write', rows_in=len(merged_df)) as stage:
+                _write_output(merged_df, output_filename, file_format, pad_csv)
+                stage.rows_out = len(merged_df)
+            
+            if timing_report:
+                _write_run_report(output_filename, timer.records, process_options, workers, profiler)
 
             final_filename = output_filename
             yield output_filename
@@ -683,7 +1281,7 @@ def convert_pdf_to_excel(
         last_file = None
         for i, df in enumerate(all_data):
             if include_date and 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date']).dt.strftime('%Y-%m-%d')
+                df['Date'] = _format_date_column(df['Date'], file_format)
             
             if custom_filename:
                 # e.g. custom_name_1.xlsx, custom_name_2.xlsx, ...
@@ -704,12 +1302,18 @@ def convert_pdf_to_excel(
                     df = df.sort_values(sort_col)
 
             # Save
-            if file_format == 'xlsx':
-                df.to_excel(output_filename, index=False)
-                auto_adjust_columns(output_filename)
-            else:
-                formatted_df = auto_adjust_columns(output_filename, df)
-                formatted_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
+            if timing_report:
+                # One report per output file, holding that PDF's stages plus its write
+                timer = StageTimer()
+                timer.extend(results[i][2])
+                timer.current_pdf = pdf_paths[i]
+            with timer.stage('write', rows_in=len(df)) as stage:
+                _write_output(df, output_filename, file_format, pad_csv)
+                stage.rows_out = len(df)
+            
+            if timing_report:
+                _write_run_report(output_filename, timer.records, process_options, workers,
+                                  profiler if i == len(all_data) - 1 else None)
             
             last_file = output_filename
         
@@ -718,8 +1322,21 @@ def convert_pdf_to_excel(
 
     yield 100  # final progress
 
+    if profiler and profiler.running:
+        profiler.stop()  # Nothing was written, so there is no report to attach the profile to
+
     if enable_logging:
+        if remove_accents:
+            cache_info = accent_cache_info()
+            logging.info(f"Accent cache: {cache_info.hits} hits, {cache_info.misses} misses, "
+                         f"{cache_info.currsize}/{cache_info.maxsize} entries")
         if final_filename:
             logging.info(f"Conversion complete. Final file: {final_filename}")
         else:
-            logging.info("Conversion complete with no output file.")
\ No newline at end of file
+            logging.info("Conversion complete with no output file.")
+
+if __name__ == "__main__":
+    # python -m pdf2excel / python pdf2excel.py: headless CLI, see pdf2excel_cli.py
+    import sys
+    from pdf2excel_cli import main
+    sys.exit(main())
@@ -0,0 +1,373 @@
+# pdf2excel_cli.py
+
+"""
+Headless command line front end for convert_pdf_to_excel(), for unattended batches.
+
+    python -m pdf2excel listings/ -o out/ --preset "Flyers Rive-Nord" --workers 4
+    python -m pdf2excel --watch inbox/ -o out/ --preset "Flyers Rive-Nord"
+
+Inputs can be PDF files and/or directories (every *.pdf in them). Without --merge,
+each PDF is converted on its own in a process pool, so one bad file doesn't stop
+the batch. In watch mode, new PDFs in the inbox are converted as they land and then
+moved to inbox/processed (or inbox/failed).
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pdf2excel import convert_pdf_to_excel, setup_logging, _init_worker_logging
+
+PRESETS_FILE = 'column_presets.json'
+DEFAULT_COLUMN_NAMES = {
+    'First Name': 'First Name',
+    'Last Name': 'Last Name',
+    'Address': 'Address',
+    'City': 'City',
+    'Province': 'Province',
+    'Postal Code': 'Postal Code'
+}
+DEFAULT_REGION_BRANCH_IDS = {
+    'flyer_north_shore': 'flyer_north_shore',
+    'flyer_south_shore': 'flyer_south_shore',
+    'flyer_montreal': 'flyer_montreal',
+    'flyer_laval': 'flyer_laval',
+    'flyer_longueuil': 'flyer_longueuil',
+    'flyer_unknown': 'flyer_unknown'
+}
+
+def load_preset(name, presets_file=PRESETS_FILE):
+    """Returns the settings dict saved by the GUI under name in column_presets.json."""
+    try:
+        with open(presets_file, 'r', encoding='utf-8') as f:
+            presets = json.load(f)
+    except FileNotFoundError:
+        raise ValueError(f"Presets file not found: {presets_file}")
+    if name not in presets:
+        available = ', '.join(sorted(presets)) or '(none)'
+        raise ValueError(f"Unknown preset '{name}'. Available presets: {available}")
+    return presets[name]
+
+def preset_to_options(settings):
+    """
+    Maps a preset (the dict ColumnSettingsDialog.get_settings() saves) to
+    convert_pdf_to_excel() keyword arguments, the same way the GUI applies it.
+    """
+    column_names = dict(settings.get('column_names') or DEFAULT_COLUMN_NAMES)
+    default_values = dict(settings.get('default_values') or {})
+    merge_names = settings.get('merge_names', False)
+    merged_name = settings.get('merged_name', 'Full Name')
+    if merge_names:
+        default_values[merged_name] = default_values.get(merged_name, "À l'occupant")
+
+    extract_apartment = settings.get('extract_apartment', False)
+    apartment_column_name = settings.get('apartment_column_name', 'Apartment')
+    include_apartment_column = settings.get('include_apartment_column', True)
+    if extract_apartment and include_apartment_column:
+        column_names['Apartment'] = apartment_column_name
+    else:
+        column_names.pop('Apartment', None)
+
+    include_phone = settings.get('include_phone', False)
+    if include_phone:
+        column_names['Phone'] = settings.get('phone_column_name', 'Phone')
+    else:
+        column_names.pop('Phone', None)
+
+    include_date = settings.get('include_date', False)
+    if include_date:
+        column_names['Date'] = settings.get('date_column_name', 'Date')
+    else:
+        column_names.pop('Date', None)
+
+    use_custom_sectors = settings.get('use_custom_sectors', False)
+    if use_custom_sectors:
+        region_branch_ids = settings.get('custom_sector_ids', {})
+    else:
+        region_branch_ids = settings.get('region_branch_ids') or dict(DEFAULT_REGION_BRANCH_IDS)
+
+    return dict(
+        column_names=column_names,
+        merge_names=merge_names,
+        merged_name=merged_name,
+        default_values=default_values,
+        merge_address=settings.get('merge_address', False),
+        # The GUI names the merged address column after the Address column
+        merged_address_name=column_names.get('Address', 'Complete Address'),
+        address_separator=settings.get('address_separator', ', '),
+        province_default=settings.get('province_default', 'QC'),
+        should_extract_apartment=extract_apartment,
+        apartment_column_name=apartment_column_name,
+        filter_apartments=extract_apartment and settings.get('filter_apartments', False),
+        include_apartment_column=include_apartment_column,
+        include_phone=include_phone,
+        phone_default=settings.get('phone_default', ''),
+        include_date=include_date,
+        date_value=settings.get('date_value'),
+        filter_by_region=settings.get('filter_by_region', False),
+        region_branch_ids=region_branch_ids,
+        use_custom_sectors=use_custom_sectors,
+        remove_accents=settings.get('remove_accents', False),
+    )
+
+def find_pdfs(paths):
+    """Expands files and directories into a sorted, de-duplicated list of PDF paths."""
+    pdfs = []
+    for path in paths:
+        if os.path.isdir(path):
+            pdfs.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith('.pdf') and os.path.isfile(os.path.join(path, name))
+            )
+        elif os.path.isfile(path):
+            pdfs.append(path)
+        else:
+            logging.warning(f"Skipping missing input: {path}")
+    seen = set()
+    return [p for p in map(os.path.abspath, pdfs) if not (p in seen or seen.add(p))]
+
+def _convert_one(pdf_path, output_dir, options):
+    """Worker entry point: convert a single PDF and return its output file name."""
+    output_file = None
+    for progress in convert_pdf_to_excel([pdf_path], output_dir, **options):
+        if isinstance(progress, str):
+            output_file = progress
+    return output_file
+
+def _log_files():
+    return [h.baseFilename for h in logging.getLogger().handlers if isinstance(h, logging.FileHandler)]
+
+def convert_batch(pdf_paths, output_dir, options, workers=1, merge=False, custom_filename=None, executor=None):
+    """
+    Converts pdf_paths and returns (outputs, failures): outputs maps each PDF (or
+    'merged') to its output file, failures maps each PDF to its error message.
+
+    merge=True writes one file through a single convert_pdf_to_excel() call, with
+    the PDFs extracted in parallel inside it. Otherwise every PDF is its own task,
+    submitted to executor (or a pool created for this call).
+    """
+    outputs, failures = {}, {}
+    if not pdf_paths:
+        return outputs, failures
+
+    if merge:
+        try:
+            for progress in convert_pdf_to_excel(pdf_paths, output_dir, merge_files=True,
+                                                 custom_filename=custom_filename, workers=workers, **options):
+                if isinstance(progress, str):
+                    outputs['merged'] = progress
+        except Exception as e:
+            logging.error(f"Merged conversion failed: {e}", exc_info=True)
+            for pdf_path in pdf_paths:
+                failures[pdf_path] = str(e)
+        return outputs, failures
+
+    if executor is None and (workers <= 1 or len(pdf_paths) == 1):
+        for pdf_path in pdf_paths:
+            try:
+                outputs[pdf_path] = _convert_one(pdf_path, output_dir, options)
+                logging.info(f"Converted {pdf_path} -> {outputs[pdf_path]}")
+            except Exception as e:
+                logging.error(f"Failed to convert {pdf_path}: {e}", exc_info=True)
+                failures[pdf_path] = str(e)
+        return outputs, failures
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(pdf_paths)),
+                                       initializer=_init_worker_logging, initargs=(_log_files(),))
+    try:
+        futures = {executor.submit(_convert_one, pdf_path, output_dir, options): pdf_path
+                   for pdf_path in pdf_paths}
+        for completed, future in enumerate(as_completed(futures), start=1):
+            pdf_path = futures[future]
+            try:
+                outputs[pdf_path] = future.result()
+                logging.info(f"[{completed}/{len(futures)}] Converted {pdf_path} -> {outputs[pdf_path]}")
+            except Exception as e:
+                logging.error(f"[{completed}/{len(futures)}] Failed to convert {pdf_path}: {e}")
+                failures[pdf_path] = str(e)
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return outputs, failures
+
+def _move_into(pdf_path, target_dir):
+    os.makedirs(target_dir, exist_ok=True)
+    target = os.path.join(target_dir, os.path.basename(pdf_path))
+    if os.path.exists(target):
+        stem, ext = os.path.splitext(os.path.basename(pdf_path))
+        target = os.path.join(target_dir, f"{stem}_{int(time.time())}{ext}")
+    shutil.move(pdf_path, target)
+
+def watch(inbox, output_dir, options, workers=1, interval=5.0, processed_dir=None, failed_dir=None,
+          once=False):
+    """
+    Polls inbox and converts PDFs that have stopped growing (same size and mtime on two
+    consecutive polls, so files still being copied are left alone). Converted files are
+    moved to processed_dir, failures to failed_dir. Runs until interrupted, or for a
+    single pass when once=True.
+    """
+    processed_dir = processed_dir or os.path.join(inbox, 'processed')
+    failed_dir = failed_dir or os.path.join(inbox, 'failed')
+    last_seen = {}
+    logging.info(f"Watching {inbox} every {interval}s (output: {output_dir})")
+
+    with ProcessPoolExecutor(max_workers=max(1, workers), initializer=_init_worker_logging,
+                             initargs=(_log_files(),)) as executor:
+        try:
+            while True:
+                ready, current = [], {}
+                for pdf_path in find_pdfs([inbox]):
+                    try:
+                        stat = os.stat(pdf_path)
+                    except OSError:
+                        continue  # Moved or deleted between listing and stat
+                    current[pdf_path] = (stat.st_size, stat.st_mtime)
+                    if last_seen.get(pdf_path) == current[pdf_path] or once:
+                        ready.append(pdf_path)
+                last_seen = {p: sig for p, sig in current.items() if p not in ready}
+
+                if ready:
+                    outputs, failures = convert_batch(ready, output_dir, options, workers, executor=executor)
+                    for pdf_path in outputs:
+                        _move_into(pdf_path, processed_dir)
+                    for pdf_path in failures:
+                        _move_into(pdf_path, failed_dir)
+
+                if once:
+                    return
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            logging.info("Stopped watching")
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m pdf2excel',
+        description="Convert Centris PDF listings to Excel/CSV without the GUI."
+    )
+    parser.add_argument('inputs', nargs='*', help="PDF files and/or directories of PDFs")
+    parser.add_argument('-o', '--output-dir', default=os.getcwd(), help="output directory (default: current)")
+    parser.add_argument('--preset', help=f"name of a preset saved from the GUI in {PRESETS_FILE}")
+    parser.add_argument('--presets-file', default=PRESETS_FILE)
+    parser.add_argument('--format', dest='file_format', choices=['xlsx', 'csv', 'parquet', 'feather'], default='xlsx',
+                        help="output format; parquet/feather need pyarrow")
+    parser.add_argument('--merge', action='store_true', help="merge all PDFs into one output file")
+    parser.add_argument('--pad-csv', action='store_true', help="left-justify CSV columns to equal width")
+    parser.add_argument('--filename', dest='custom_filename', help="merged output file name, without extension (with --merge)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="parallel PDFs (default: CPU count)")
+    parser.add_argument('--page-workers', type=int, default=1, help="parallel page ranges within one PDF")
+    parser.add_argument('--streaming', action='store_true')
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false', help="disable the extraction cache")
+    parser.add_argument('--cache-dir')
+    parser.add_argument('--engine', choices=['table', 'layout'], default='table',
+                        help="table extractor; 'layout' reuses the first page's column layout (faster)")
+    parser.add_argument('--timing-report', action='store_true', help="write <output>.timing.json next to each output")
+    parser.add_argument('--profile', choices=['cprofile', 'pyinstrument'])
+    parser.add_argument('--log', action='store_true', help="also write a log file to logs/")
+
+    settings = parser.add_argument_group('conversion settings (override the preset)')
+    settings.add_argument('--merge-names', action='store_true', default=None)
+    settings.add_argument('--merged-name')
+    settings.add_argument('--merge-address', action='store_true', default=None)
+    settings.add_argument('--address-separator')
+    settings.add_argument('--province', dest='province_default')
+    settings.add_argument('--extract-apartment', dest='should_extract_apartment', action='store_true', default=None)
+    settings.add_argument('--apartment-column-name')
+    settings.add_argument('--filter-apartments', action='store_true', default=None)
+    settings.add_argument('--no-apartment-column', dest='include_apartment_column', action='store_false', default=None)
+    settings.add_argument('--include-phone', action='store_true', default=None)
+    settings.add_argument('--phone-default')
+    settings.add_argument('--include-date', action='store_true', default=None)
+    settings.add_argument('--date', dest='date_value', help="date column value (YYYY-MM-DD)")
+    settings.add_argument('--filter-by-region', action='store_true', default=None)
+    settings.add_argument('--use-custom-sectors', action='store_true', default=None)
+    settings.add_argument('--remove-accents', action='store_true', default=None)
+
+    watch_group = parser.add_argument_group('watch mode')
+    watch_group.add_argument('--watch', metavar='INBOX', help="convert PDFs as they land in INBOX")
+    watch_group.add_argument('--interval', type=float, default=5.0, help="seconds between polls (default: 5)")
+    watch_group.add_argument('--processed-dir', help="where converted PDFs go (default: INBOX/processed)")
+    watch_group.add_argument('--failed-dir', help="where failed PDFs go (default: INBOX/failed)")
+    watch_group.add_argument('--once', action='store_true', help="process the inbox once and exit")
+    return parser
+
+OVERRIDE_KEYS = [
+    'merge_names', 'merged_name', 'merge_address', 'address_separator', 'province_default',
+    'should_extract_apartment', 'apartment_column_name', 'filter_apartments', 'include_apartment_column',
+    'include_phone', 'phone_default', 'include_date', 'date_value', 'filter_by_region',
+    'use_custom_sectors', 'remove_accents'
+]
+
+def options_from_args(args):
+    """convert_pdf_to_excel() keyword arguments from the preset plus command line overrides."""
+    settings = load_preset(args.preset, args.presets_file) if args.preset else {}
+    options = preset_to_options(settings)
+    for key in OVERRIDE_KEYS:
+        value = getattr(args, key)
+        if value is not None:
+            options[key] = value
+    if options['include_phone']:
+        options['column_names'].setdefault('Phone', 'Phone')
+    if options['include_date']:
+        options['column_names'].setdefault('Date', 'Date')
+    if options['should_extract_apartment'] and options['include_apartment_column']:
+        options['column_names']['Apartment'] = options['apartment_column_name']
+    options.update(
+        file_format=args.file_format,
+        enable_logging=args.log,
+        page_workers=args.page_workers,
+        streaming=args.streaming,
+        use_cache=args.use_cache,
+        cache_dir=args.cache_dir,
+        engine=args.engine,
+        pad_csv=args.pad_csv,
+        timing_report=args.timing_report,
+        profile=args.profile,
+    )
+    return options
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.inputs and not args.watch:
+        parser.error("give at least one PDF/directory, or --watch INBOX")
+
+    if args.log:
+        setup_logging()
+    else:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    try:
+        options = options_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    output_dir = os.path.abspath(args.output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    if args.watch:
+        watch(args.watch, output_dir, options, workers=args.workers, interval=args.interval,
+              processed_dir=args.processed_dir, failed_dir=args.failed_dir, once=args.once)
+        return 0
+
+    pdf_paths = find_pdfs(args.inputs)
+    if not pdf_paths:
+        logging.error("No PDF files found")
+        return 1
+
+    started = time.perf_counter()
+    logging.info(f"Converting {len(pdf_paths)} PDF(s) with {args.workers} worker(s)")
+    outputs, failures = convert_batch(pdf_paths, output_dir, options, workers=args.workers,
+                                      merge=args.merge, custom_filename=args.custom_filename)
+    logging.info(f"Done in {time.perf_counter() - started:.1f}s: {len(outputs)} output(s), {len(failures)} failure(s)")
+    for pdf_path, error in failures.items():
+        logging.error(f"  {pdf_path}: {error}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
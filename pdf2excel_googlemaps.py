@@ -2,7 +2,6 @@ import pdfplumber
 import pandas as pd
 import re
 import requests
-import time
 import urllib.parse
 from concurrent.futures import ThreadPoolExecutor
 from tkinter import Tk, filedialog
@@ -10,6 +9,9 @@ import os
 import requests_cache
 from dotenv import load_dotenv
 from city_mappings import get_city_from_borough
+from geocode_store import GeocodeStore
+from checkpoint_journal import CheckpointJournal
+from rate_limiter import AdaptiveRateLimiter
 
 # Enable in-memory caching for requests
 requests_cache.install_cache('google_maps_cache', backend='memory', expire_after=86400)  # Cache expires after 1 day
@@ -18,6 +20,9 @@ requests_cache.install_cache('google_maps_cache', backend='memory', expire_after
 load_dotenv()
 API_KEY = os.getenv('GOOGLE_MAPS_API_KEY')
 
+# Geocoding requests per second across all worker threads; lowered automatically on OVER_QUERY_LIMIT
+GOOGLE_MAPS_QPS = float(os.getenv('GOOGLE_MAPS_QPS', 20))
+
 # Function to get file paths using a file dialog
 def get_pdf_paths():
     root = Tk()
@@ -97,6 +102,12 @@ if __name__ == "__main__":
     pdf_paths = get_pdf_paths()
     pdf_dataframes = parallel_pdf_extraction(pdf_paths)
 
+    # Shared with pdf2excel_postgrid: addresses geocoded on earlier runs are not looked up again
+    geocode_store = GeocodeStore()
+
+    # One limiter for every geocoding thread of every PDF in this run
+    rate_limiter = AdaptiveRateLimiter(GOOGLE_MAPS_QPS)
+
     for i, df in enumerate(pdf_dataframes):
         if df is not None:
             df.dropna(how="all", inplace=True)
@@ -123,22 +134,23 @@ if __name__ == "__main__":
                 # Separate apartment numbers and clean addresses
                 df['cleaned_address'], df['apartment'] = zip(*df['address'].apply(separate_apartment))
 
-                # Google Maps API Geocoding Cache to store results and avoid redundant requests
-                cache = {}
-
                 def geocode_address(row, retries=3):
                     address = row.cleaned_address
                     city = row.mun_bor
                     full_address = f"{address}, {city}, QC, Canada"
                     encoded_address = urllib.parse.quote(full_address)
-                    if full_address in cache:
-                        return cache[full_address]
+                    stored = geocode_store.get(address, city)
+                    if stored:
+                        return stored['postal_code'], stored['province'], stored['city']
                     try:
                         for attempt in range(retries):
-                            time.sleep(0.5)
+                            if attempt:
+                                rate_limiter.retried()
+                            rate_limiter.acquire()
                             response = requests.get(f"https://maps.googleapis.com/maps/api/geocode/json?address={encoded_address}&components=locality:{city}|country:CA&key={API_KEY}")
                             data = response.json()
                             if data['status'] == 'OK':
+                                rate_limiter.succeeded()
                                 result = data['results'][0]
                                 address_components = result['address_components']
                                 postal_code = next((c['long_name'] for c in address_components if 'postal_code' in c['types']), None)
@@ -149,11 +161,13 @@ if __name__ == "__main__":
                                 full_city = next((c['long_name'] for c in address_components if 'locality' in c['types']), city)
                                 
                                 if country == 'CA':
-                                    cache[full_address] = (postal_code, province, full_city)
+                                    geocode_store.put(address, city, postal_code, province, full_city, source='googlemaps')
                                     return postal_code, province, full_city
 
-                            elif data['status'] in ['OVER_QUERY_LIMIT', 'UNKNOWN_ERROR']:
-                                time.sleep(1)
+                            elif data['status'] == 'OVER_QUERY_LIMIT':
+                                rate_limiter.throttled()
+                            elif data['status'] == 'UNKNOWN_ERROR':
+                                continue  # Transient server error, retry at the current rate
                             else:
                                 print(f"Failed to geocode address: {full_address}, Status: {data['status']}, Error: {data.get('error_message', 'N/A')}")
                                 break
@@ -161,9 +175,24 @@ if __name__ == "__main__":
                         print(f"Geocoding error: {e}")
                     return None, None, None
 
+                # Rows geocoded before an interrupted run of this PDF are taken from the journal,
+                # and every newly geocoded row is recorded as soon as it completes
+                journal = CheckpointJournal(pdf_paths[i], 'googlemaps')
+                completed = journal.completed()
+                if completed:
+                    print(f"Resuming from checkpoint: {len(completed)} of {len(df)} addresses already geocoded")
+
+                def geocode_row(row):
+                    if row.Index in completed:
+                        return tuple(completed[row.Index])
+                    result = geocode_address(row)
+                    if result[0]:
+                        journal.record(row.Index, result)
+                    return result
+
                 # Use ThreadPoolExecutor to speed up geocoding requests
                 with ThreadPoolExecutor(max_workers=10) as executor:
-                    geocode_results = list(executor.map(geocode_address, [row for row in df.itertuples(index=False)]))
+                    geocode_results = list(executor.map(geocode_row, df.itertuples()))
 
                 # Apply geocoding results to the DataFrame
                 df[['postal_code', 'province', 'full_city']] = pd.DataFrame(geocode_results, index=df.index)
@@ -198,6 +227,8 @@ if __name__ == "__main__":
                 # Export the final DataFrame to an Excel file
                 output_filename = f'output_excel/{os.path.splitext(os.path.basename(pdf_paths[i]))[0]}_listings.xlsx'
                 output_df.to_excel(output_filename, index=False, engine='openpyxl')
+                journal.finish()
+                journal.close()
 
                 print(f"Excel file '{output_filename}' has been created successfully.")
                 print(f"Validated addresses: {output_df['add1'].notna().sum()}")
@@ -205,4 +236,10 @@ if __name__ == "__main__":
             else:
                 print(f"Required columns 'Mun/Bor.' and 'Address' not found in the extracted data for {os.path.basename(pdf_paths[i])}.")
         else:
-            print(f"No data extracted from the provided PDF file: {os.path.basename(pdf_paths[i])}.")
\ No newline at end of file
+            print(f"No data extracted from the provided PDF file: {os.path.basename(pdf_paths[i])}.")
+
+    print(f"Geocode store: {geocode_store.hits} hits, {geocode_store.misses} misses")
+    stats = rate_limiter.stats()
+    print(f"Geocoding requests: {stats['requests']}, throttled: {stats['throttles']}, retries: {stats['retries']}, "
+          f"final rate: {stats['rate']:.1f}/s")
+    geocode_store.close()
\ No newline at end of file
@@ -4,7 +4,6 @@ import json
 import time
 import logging
 import ctypes
-import pandas as pd
 from datetime import datetime
 
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
@@ -322,6 +321,7 @@ class ConversionThread(QThread):
         self.use_custom_sectors = False
         self.custom_sector_ids = {}
         self.remove_accents = False
+        self.use_cache = True
 
     def run(self):
         try:
@@ -374,7 +374,8 @@ class ConversionThread(QThread):
                 self.filter_by_region,
                 self.region_branch_ids,
                 use_custom_sectors=self.use_custom_sectors,
-                remove_accents=self.remove_accents
+                remove_accents=self.remove_accents,
+                use_cache=self.use_cache
             ):
                 if isinstance(progress, str):
                     output_file = progress
@@ -11,25 +11,34 @@ a = Analysis(
         'pandas',
         'pdfplumber',
         'openpyxl',
-        'tabula',
         'PyQt5',
         'PyQt5.QtCore',
         'PyQt5.QtGui',
         'PyQt5.QtWidgets',
         'unidecode',
-        'requests',
-        'requests_cache',
-        'dotenv',
-        'Levenshtein',
-        'retry',
         'pdf2excel',
         'quebec_regions_mapping',
         'city_mappings',
+        'accent_cache',
+        'extraction_cache',
+        'instrumentation',
+        'layout_extraction',
     ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # API-script and unused dependencies; the GUI only runs the simple processing path
+    excludes=[
+        'tabula',
+        'requests',
+        'requests_cache',
+        'dotenv',
+        'Levenshtein',
+        'retry',
+        'tkinter',
+        'matplotlib',
+        'IPython',
+    ],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
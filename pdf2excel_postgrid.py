@@ -1,6 +1,7 @@
 import pdfplumber
 import pandas as pd
 import re
+import asyncio
 import requests
 import time
 from concurrent.futures import ThreadPoolExecutor
@@ -9,6 +10,9 @@ import os
 import requests_cache
 import json
 from city_mappings import get_city_from_borough
+from geocode_store import GeocodeStore
+from checkpoint_journal import CheckpointJournal
+from postgrid_client import PostGridClient, DEFAULT_BASE_URL, DEFAULT_CONCURRENCY, DEFAULT_REQUESTS_PER_SECOND
 from dotenv import load_dotenv
 import logging
 from logging.handlers import RotatingFileHandler
@@ -69,6 +73,21 @@ load_dotenv()
 # PostGrid API Key
 API_KEY = os.getenv('POSTGRID_API_KEY')
 
+# API client settings; POSTGRID_BASE_URL can point at a local mock server for testing
+POSTGRID_BASE_URL = os.getenv('POSTGRID_BASE_URL', DEFAULT_BASE_URL)
+POSTGRID_CONCURRENCY = int(os.getenv('POSTGRID_CONCURRENCY', DEFAULT_CONCURRENCY))
+POSTGRID_REQUESTS_PER_SECOND = float(os.getenv('POSTGRID_REQUESTS_PER_SECOND', DEFAULT_REQUESTS_PER_SECOND))
+
+# Batch verification is sent in chunks of POSTGRID_BATCH_SIZE addresses, up to
+# POSTGRID_BATCHES_IN_FLIGHT at a time; a failing chunk is retried on its own
+POSTGRID_BATCH_SIZE = int(os.getenv('POSTGRID_BATCH_SIZE', 100))
+POSTGRID_BATCHES_IN_FLIGHT = int(os.getenv('POSTGRID_BATCHES_IN_FLIGHT', 4))
+POSTGRID_BATCH_RETRIES = int(os.getenv('POSTGRID_BATCH_RETRIES', 2))
+
+def postgrid_client():
+    return PostGridClient(API_KEY, base_url=POSTGRID_BASE_URL, max_concurrency=POSTGRID_CONCURRENCY,
+                          requests_per_second=POSTGRID_REQUESTS_PER_SECOND, logger=logger)
+
 # Function to get file paths using a file dialog
 def get_pdf_paths():
     root = Tk()
@@ -126,6 +145,14 @@ def format_address_for_postgrid(address, apartment):
         return f"{apartment}-{address}"
     return address
 
+# Inverse of format_address_for_postgrid: splits "12-123 Main St" into ("123 Main St", "12")
+def split_postgrid_line1(line1):
+    apt_match = re.match(r'^(\d+[a-zA-Z]?)-(.+)$', line1 or '')
+    if apt_match:
+        apt_number, main_address = apt_match.groups()
+        return main_address, apt_number
+    return line1, None
+
 # Add a retry decorator to handle temporary API failures
 @retry(tries=3, delay=1, backoff=2)
 def postgrid_api_call(url, method='post', **kwargs):
@@ -195,135 +222,285 @@ def find_best_suggestion(input_address, input_city, suggestions):
 
     return best_match or apartment_building_match
 
+# Picks the suggestion whose city matches mapped_city from a suggestions API response
+def select_suggestion(address, mapped_city, data):
+    full_address = f"{address}, {mapped_city}, QC, Canada"
+    logger.debug(f"Suggestions API response: {json.dumps(data, indent=2)}")
+    
+    if data.get("status") == "success":
+        suggestions = data.get("data", [])
+        if suggestions:
+            best_match = None
+            highest_similarity = 0
+            for suggestion in suggestions:
+                suggested_city = suggestion.get("city", "").lower()
+                similarity = Levenshtein.ratio(mapped_city.lower(), suggested_city)
+                if similarity > highest_similarity and similarity >= 0.8:  # 80% match threshold
+                    highest_similarity = similarity
+                    best_match = suggestion
+            
+            if best_match:
+                logger.info(f"Best matching suggestion found for '{address}' in '{mapped_city}': {best_match}")
+                logger.info(f"City similarity: {highest_similarity:.2f}")
+                return best_match
+            else:
+                logger.warning(f"No suitable suggestion found for: {full_address}")
+                logger.debug(f"Input address: {address}")
+                logger.debug(f"Suggestions: {json.dumps(suggestions, indent=2)}")
+            
+            # If no best match is found, create a custom suggestion based on input
+            custom_suggestion = {
+                "line1": address,
+                "city": mapped_city,
+                "provinceOrState": "QC",
+                "country": "CA",
+                "postalOrZip": suggestions[0].get("postalOrZip") if suggestions else ""
+            }
+            return custom_suggestion
+        else:
+            logger.warning(f"No suggestions found for: {full_address}")
+    else:
+        logger.error(f"Suggestions API Error: {json.dumps(data, indent=2)}")
+    
+    return {}
+
+# Maps the borough to its city and builds the address sent to the suggestions API
+def suggestion_query(address, city):
+    mapped_city = get_city_from_borough(city)
+    logger.info(f"Mapped city from '{city}' to '{mapped_city}'")
+    
+    full_address = f"{address}, {mapped_city}, QC, Canada"
+    logger.debug(f"Suggestions API request for: {full_address}")
+    return mapped_city, full_address
+
 def postgrid_suggest_address(address, city):
-    url = "https://api.postgrid.com/v1/addver/suggestions"
+    url = f"{POSTGRID_BASE_URL}/suggestions"
     headers = {
         "x-api-key": API_KEY,
         "Content-Type": "application/json"
     }
     
-    mapped_city = get_city_from_borough(city)
-    logger.info(f"Mapped city from '{city}' to '{mapped_city}'")
-    
-    full_address = f"{address}, {mapped_city}, QC, Canada"
+    mapped_city, full_address = suggestion_query(address, city)
     payload = {
         "address": full_address,
         "country": "CA",
         "maxResults": 10
     }
     
-    logger.debug(f"Suggestions API request for: {full_address}")
-    
     try:
         data = postgrid_api_call(url, json=payload, headers=headers)
-        logger.debug(f"Suggestions API response: {json.dumps(data, indent=2)}")
-        
-        if data.get("status") == "success":
-            suggestions = data.get("data", [])
-            if suggestions:
-                best_match = None
-                highest_similarity = 0
-                for suggestion in suggestions:
-                    suggested_city = suggestion.get("city", "").lower()
-                    similarity = Levenshtein.ratio(mapped_city.lower(), suggested_city)
-                    if similarity > highest_similarity and similarity >= 0.8:  # 80% match threshold
-                        highest_similarity = similarity
-                        best_match = suggestion
-                
-                if best_match:
-                    logger.info(f"Best matching suggestion found for '{address}' in '{mapped_city}': {best_match}")
-                    logger.info(f"City similarity: {highest_similarity:.2f}")
-                    return best_match
-                else:
-                    logger.warning(f"No suitable suggestion found for: {full_address}")
-                    logger.debug(f"Input address: {address}")
-                    logger.debug(f"Suggestions: {json.dumps(suggestions, indent=2)}")
-                
-                # If no best match is found, create a custom suggestion based on input
-                custom_suggestion = {
-                    "line1": address,
-                    "city": mapped_city,
-                    "provinceOrState": "QC",
-                    "country": "CA",
-                    "postalOrZip": suggestions[0].get("postalOrZip") if suggestions else ""
-                }
-                return custom_suggestion
-            else:
-                logger.warning(f"No suggestions found for: {full_address}")
-        else:
-            logger.error(f"Suggestions API Error: {json.dumps(data, indent=2)}")
+        return select_suggestion(address, mapped_city, data)
+    except Exception as e:
+        logger.exception(f"PostGrid Suggestions API error: {e}")
+    
+    return {}
+
+async def postgrid_suggest_address_async(client, address, city):
+    mapped_city, full_address = suggestion_query(address, city)
+    
+    try:
+        data = await client.suggestions(full_address)
+        return select_suggestion(address, mapped_city, data)
     except Exception as e:
         logger.exception(f"PostGrid Suggestions API error: {e}")
     
     return {}
 
-# Update the get_postal_code function
-def get_postal_code(address, city):
-    suggested = postgrid_suggest_address(address, city)
+async def get_postal_code_async(client, address, city):
+    suggested = await postgrid_suggest_address_async(client, address, city)
     postal_code = suggested.get("postalOrZip", "")
     confidence = "high" if postal_code else "low"
     logger.info(f"Suggested postal code for {address}, {city}: {postal_code} (Confidence: {confidence})")
     return postal_code, confidence
 
-# Update the postgrid_validate_addresses_batch function
-def postgrid_validate_addresses_batch(addresses):
-    url = "https://api.postgrid.com/v1/addver/verifications/batch"
-    headers = {
-        "x-api-key": API_KEY,
-        "Content-Type": "application/json"
+# Verified address for an address already in the geocode store, in the batch results format
+def stored_verified_address(address, stored):
+    main_address, apartment = split_postgrid_line1(address['line1'])
+    line1 = stored['line1'] or main_address
+    return {
+        "line1": format_address_for_postgrid(line1, apartment),
+        "city": stored['city'],
+        "provinceOrState": stored['province'],
+        "country": "CA",
+        "postalOrZip": stored['postal_code'],
+        "confidence": stored['confidence']
     }
+
+# Update the postgrid_validate_addresses_batch function
+def postgrid_validate_addresses_batch(addresses, store=None, journal=None):
+    """
+    Validates addresses and returns one result per address, in order. With a
+    GeocodeStore, addresses it already holds are answered from it and only the
+    rest are sent to PostGrid; their results are added to the store. With a
+    CheckpointJournal, rows it holds from an interrupted run are not validated
+    again, and resolved rows are recorded as soon as their chunk completes.
+    """
+    results = [None] * len(addresses)
+    if journal is not None:
+        for i, result in journal.completed().items():
+            if i < len(addresses):
+                results[i] = result
+        resumed = sum(result is not None for result in results)
+        if resumed:
+            logger.info(f"Resuming from checkpoint: {resumed} of {len(addresses)} addresses already validated")
+    
+    missing = []
+    for i, address in enumerate(addresses):
+        if results[i] is not None:
+            continue
+        if store is not None:
+            main_address, _ = split_postgrid_line1(address['line1'])
+            stored = store.get(main_address, address['city'])
+            if stored:
+                logger.info(f"Geocode store hit for: {address['line1']}, {address['city']}")
+                results[i] = {"verifiedAddress": stored_verified_address(address, stored)}
+                continue
+        missing.append(i)
     
-    # Get postal codes first and map cities
+    def on_chunk(offset, chunk_results):
+        resolved = [(i, result) for i, result in zip(missing[offset:], chunk_results)
+                    if result.get("verifiedAddress", {}).get("confidence") == "high"]
+        if journal is not None:
+            journal.record_many(resolved)
+        if store is not None:
+            for i, result in resolved:
+                verified_address = result["verifiedAddress"]
+                main_address, _ = split_postgrid_line1(addresses[i]['line1'])
+                verified_line1, _ = split_postgrid_line1(verified_address.get("line1", ""))
+                store.put(main_address, addresses[i]['city'],
+                          postal_code=verified_address.get("postalOrZip"),
+                          province=verified_address.get("provinceOrState"),
+                          result_city=verified_address.get("city"),
+                          confidence=verified_address["confidence"],
+                          source='postgrid',
+                          line1=verified_line1)
+    
+    if missing:
+        fetched = _postgrid_validate_batch([addresses[i] for i in missing], on_chunk=on_chunk)
+        for i, result in zip(missing, fetched):
+            results[i] = result
+    return results
+
+def _postgrid_validate_batch(addresses, on_chunk=None):
+    return asyncio.run(_postgrid_validate_batch_async(addresses, on_chunk))
+
+async def _postgrid_validate_batch_async(addresses, on_chunk=None):
     for address in addresses:
-        mapped_city = get_city_from_borough(address['city'])
-        address['city'] = mapped_city
-        postal_code, confidence = get_postal_code(address['line1'], mapped_city)
-        address['postalOrZip'] = postal_code
-        address['confidence'] = confidence
+        address['city'] = get_city_from_borough(address['city'])
     
-    payload = {"addresses": addresses}
+    offsets = range(0, len(addresses), POSTGRID_BATCH_SIZE)
+    async with postgrid_client() as client:
+        in_flight = asyncio.Semaphore(POSTGRID_BATCHES_IN_FLIGHT)
+        chunk_results = await asyncio.gather(*(
+            _validate_chunk(client, addresses[offset:offset + POSTGRID_BATCH_SIZE], number, in_flight, offset, on_chunk)
+            for number, offset in enumerate(offsets, start=1)))
+        logger.info(f"PostGrid requests: {client.requests} ({client.retried} retries)")
     
-    try:
-        data = postgrid_api_call(url, json=payload, headers=headers)
-        logger.debug(f"Batch validation API response: {json.dumps(data, indent=2)}")
-        
-        if data.get("status") == "success":
-            results = data.get("data", {}).get("results", [])
-            if isinstance(results, list):
-                for i, result in enumerate(results):
-                    verified_address = result.get("verifiedAddress", {})
-                    original_address = addresses[i]
-                    
-                    if verified_address:
-                        logger.info(f"Processing verified address: {verified_address}")
-                        if not verified_address.get("postalOrZip"):
-                            verified_address["postalOrZip"] = original_address['postalOrZip']
-                            logger.info(f"Using pre-fetched postal code: {verified_address['postalOrZip']}")
-                        verified_address["confidence"] = original_address['confidence']
-                    else:
-                        logger.warning(f"No verified address for: {original_address['line1']}, {original_address['city']}")
-                        verified_address = {
-                            "line1": original_address['line1'],
-                            "city": original_address['city'],
-                            "provinceOrState": original_address['provinceOrState'],
-                            "country": original_address['country'],
-                            "postalOrZip": original_address['postalOrZip'],
-                            "confidence": "low"
-                        }
-                    
-                    result["verifiedAddress"] = verified_address
+    # gather() keeps the chunk order, so the results line up with addresses
+    return [result for results in chunk_results for result in results]
+
+# on_chunk(offset, results) is called with each chunk's results as soon as they are complete
+async def _validate_chunk(client, addresses, chunk_number, in_flight, offset=0, on_chunk=None):
+    # Phase one: verify the chunk
+    async with in_flight:
+        results = await verify_chunk(client, addresses, chunk_number)
+    if results is None:
+        results = [{} for _ in addresses]  # Every address falls through to phase two
+    
+    # Phase two: suggestion lookups only for the addresses verification didn't resolve.
+    # They run while later chunks are still being verified.
+    pending = [i for i, result in enumerate(results) if needs_suggestion(result.get("verifiedAddress"))]
+    logger.info(f"Batch chunk {chunk_number}: verification resolved {len(addresses) - len(pending)} "
+                f"of {len(addresses)} addresses, looking up suggestions for {len(pending)}")
+    postal_codes = await asyncio.gather(*(get_postal_code_async(client, addresses[i]['line1'], addresses[i]['city'])
+                                          for i in pending))
+    suggested = dict(zip(pending, postal_codes))
+    
+    results = [complete_result(address, result, suggested.get(i))
+               for i, (address, result) in enumerate(zip(addresses, results))]
+    if on_chunk is not None:
+        on_chunk(offset, results)
+    return results
+
+# Batch verification of one chunk, retried as a whole; None if every attempt failed
+async def verify_chunk(client, addresses, chunk_number, retries=None):
+    retries = POSTGRID_BATCH_RETRIES if retries is None else retries
+    for attempt in range(retries + 1):
+        try:
+            data = await client.verify_batch(addresses)
+            logger.debug(f"Batch validation API response: {json.dumps(data, indent=2)}")
+            results = parse_batch_results(data)
+            if results is not None and len(results) == len(addresses):
                 return results
-            else:
-                logger.error(f"Unexpected results format: {results}")
+            if results is not None:
+                logger.error(f"Batch chunk {chunk_number} returned {len(results)} results for {len(addresses)} addresses")
+        except Exception as e:
+            logger.exception(f"PostGrid Batch API error: {e}")
+        
+        if attempt < retries:
+            logger.warning(f"Retrying batch chunk {chunk_number} ({attempt + 1}/{retries})")
+            await asyncio.sleep(client.backoff_delay(attempt))
+    
+    logger.error(f"Batch chunk {chunk_number} failed, its addresses fall back to suggestion lookups")
+    return None
+
+# The per-address results of a batch verification response, or None if the call failed
+def parse_batch_results(data):
+    if data.get("status") == "success":
+        results = data.get("data", {}).get("results", [])
+        if isinstance(results, list):
+            return results
+        logger.error(f"Unexpected results format: {results}")
+    else:
+        logger.error(f"Batch API Error: {json.dumps(data, indent=2)}")
+    return None
+
+# Verification left the address unresolved: no match, no postal code, or a failed verification
+def needs_suggestion(verified_address):
+    return (not verified_address
+            or not verified_address.get("postalOrZip")
+            or verified_address.get("status") == "failed")
+
+# Fills in a verification result with the suggested postal code (if one was looked up) and confidence
+def complete_result(address, result, suggestion=None):
+    verified_address = result.get("verifiedAddress") or {}
+    
+    if suggestion is None:
+        logger.info(f"Processing verified address: {verified_address}")
+        address['postalOrZip'] = verified_address["postalOrZip"]
+        address['confidence'] = "high"
+        verified_address["confidence"] = "high"
+    else:
+        address['postalOrZip'], address['confidence'] = suggestion
+        if verified_address:
+            logger.info(f"Processing verified address: {verified_address}")
+            if verified_address.get("status") == "failed":
+                # A failed verification's postal code is never trusted: use the suggestion's or mark the row low
+                if address['postalOrZip']:
+                    verified_address["postalOrZip"] = address['postalOrZip']
+                    logger.info(f"Verification failed, using suggested postal code: {verified_address['postalOrZip']}")
+                else:
+                    address['confidence'] = "low"
+            elif not verified_address.get("postalOrZip"):
+                verified_address["postalOrZip"] = address['postalOrZip']
+                logger.info(f"Using suggested postal code: {verified_address['postalOrZip']}")
+            verified_address["confidence"] = address['confidence']
         else:
-            logger.error(f"Batch API Error: {json.dumps(data, indent=2)}")
-    except Exception as e:
-        logger.exception(f"PostGrid Batch API error: {e}")
+            logger.warning(f"No verified address for: {address['line1']}, {address['city']}")
+            verified_address = {
+                "line1": address['line1'],
+                "city": address['city'],
+                "provinceOrState": address['provinceOrState'],
+                "country": address['country'],
+                "postalOrZip": address['postalOrZip'],
+                "confidence": "low"
+            }
     
-    return []
+    result["verifiedAddress"] = verified_address
+    return result
 
 def postgrid_autocomplete_address(address):
-    url = "https://api.postgrid.com/v1/addver/completions"
+    url = f"{POSTGRID_BASE_URL}/completions"
     headers = {
         "x-api-key": API_KEY,
         "Content-Type": "application/x-www-form-urlencoded"
@@ -397,6 +574,9 @@ if __name__ == "__main__":
         exit(1)
 
     pdf_dataframes = parallel_pdf_extraction(pdf_paths)
+    
+    # Addresses validated on earlier runs (by this script or pdf2excel_googlemaps) are not looked up again
+    geocode_store = GeocodeStore()
 
     for pdf_path, df in zip(pdf_paths, pdf_dataframes):
         if df is not None:
@@ -410,9 +590,6 @@ if __name__ == "__main__":
 
             df = df.reset_index(drop=True)
 
-            # Take only the 0 rows for testing
-            df = df.head(300)
-
             mun_bor_column = next((col for col in df.columns if 'mun' in col or 'bor' in col), None)
             address_column = next((col for col in df.columns if 'address' in col), None)
 
@@ -433,7 +610,9 @@ if __name__ == "__main__":
 
                 # Perform batch validation for this PDF file
                 if addresses_to_validate:
-                    batch_results = postgrid_validate_addresses_batch(addresses_to_validate)
+                    # Rows validated before an interrupted run of this PDF are taken from the journal
+                    journal = CheckpointJournal(pdf_path, 'postgrid')
+                    batch_results = postgrid_validate_addresses_batch(addresses_to_validate, store=geocode_store, journal=journal)
                     
                     if batch_results:
                         # Process batch results
@@ -446,13 +625,11 @@ if __name__ == "__main__":
                                 postgrid_city = verified_address.get("city", "")
                                 mapped_city = get_city_from_borough(postgrid_city)
                                 
-                                verified_line1 = verified_address.get('line1', '')
-                                apt_match = re.match(r'^(\d+[a-zA-Z]?)-(.+)$', verified_line1)
-                                if apt_match:
-                                    apt_number, main_address = apt_match.groups()
+                                main_address, apt_number = split_postgrid_line1(verified_address.get('line1', ''))
+                                if apt_number:
                                     full_address = f"{main_address}, Apt. {apt_number}"
                                 else:
-                                    full_address = verified_line1
+                                    full_address = main_address
                                 
                                 validated_address = {
                                     "address": full_address,
@@ -519,6 +696,7 @@ if __name__ == "__main__":
 
                         # Save the workbook
                         wb.save(output_filename)
+                        journal.finish()
 
                         logger.info(f"Final output DataFrame:\n{output_df.to_string()}")
 
@@ -528,6 +706,7 @@ if __name__ == "__main__":
                         print(f"Low confidence rows: {(output_df['confidence'] == 'low').sum()}")
                     else:
                         print(f"No addresses validated in {os.path.basename(pdf_path)}.")
+                    journal.close()
                 else:
                     print(f"No addresses to validate in {os.path.basename(pdf_path)}.")
             else:
@@ -535,6 +714,9 @@ if __name__ == "__main__":
         else:
             print(f"No data extracted from the provided PDF file: {os.path.basename(pdf_path)}.")
 
+    geocode_store.log_stats(logger)
+    geocode_store.close()
+    
     # At the end of your main execution
     logger.info("PostGrid address processing completed")
     print(f"Detailed API logs have been saved to: {log_file}")
\ No newline at end of file
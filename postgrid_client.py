@@ -0,0 +1,112 @@
+# postgrid_client.py
+
+import asyncio
+import logging
+import random
+
+from rate_limiter import AsyncTokenBucket
+
+DEFAULT_BASE_URL = "https://api.postgrid.com/v1/addver"
+DEFAULT_CONCURRENCY = 10
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+
+# Retried with backoff; any other 4xx is returned to the caller as-is
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class PostGridClient:
+    """
+    asyncio client for the PostGrid address verification API.
+
+    One httpx.AsyncClient per client keeps its connections alive across calls. At most
+    max_concurrency requests are in flight, and requests start at no more than
+    requests_per_second (token bucket, bursts up to max_concurrency). Transport errors,
+    429 and 5xx responses are retried up to retries times with exponential backoff
+    and full jitter; a 429's Retry-After is honoured when it is longer.
+
+    base_url points at PostGrid by default; tests can point it at a local mock server.
+
+        async with PostGridClient(api_key) as client:
+            data = await client.suggestions("123 Main St, Montreal, QC, Canada")
+    """
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, max_concurrency=DEFAULT_CONCURRENCY,
+                 requests_per_second=DEFAULT_REQUESTS_PER_SECOND, retries=3, backoff=1.0,
+                 max_backoff=30.0, timeout=30.0, logger=logging):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.logger = logger
+        self.requests = 0
+        self.retried = 0
+        self._client = None
+        self._semaphore = None
+        self._bucket = None
+
+    async def __aenter__(self):
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("pdf2excel_postgrid needs httpx for its API client: pip install httpx") from e
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"x-api-key": self.api_key},
+            limits=httpx.Limits(max_connections=self.max_concurrency,
+                                max_keepalive_connections=self.max_concurrency),
+            timeout=self.timeout,
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._bucket = AsyncTokenBucket(self.requests_per_second, capacity=self.max_concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._client.aclose()
+        self._client = None
+
+    def backoff_delay(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass  # HTTP-date form; keep the jittered delay
+        return delay
+
+    async def request(self, method, path, **kwargs):
+        """Sends one request with retries and returns the decoded JSON body."""
+        import httpx
+
+        attempt = 0
+        while True:
+            await self._bucket.acquire()
+            retry_after = None
+            async with self._semaphore:
+                self.requests += 1
+                try:
+                    response = await self._client.request(method, path, **kwargs)
+                except httpx.TransportError as e:
+                    if attempt >= self.retries:
+                        raise
+                    self.logger.warning(f"PostGrid {path} failed ({e!r}), retrying")
+                else:
+                    if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                        response.raise_for_status()
+                        return response.json()
+                    retry_after = response.headers.get("Retry-After")
+                    self.logger.warning(f"PostGrid {path} returned {response.status_code}, retrying")
+
+            # Sleep outside the semaphore so other requests can use the slot meanwhile
+            await asyncio.sleep(self.backoff_delay(attempt, retry_after))
+            attempt += 1
+            self.retried += 1
+
+    async def suggestions(self, address, country="CA", max_results=10):
+        payload = {"address": address, "country": country, "maxResults": max_results}
+        return await self.request("POST", "/suggestions", json=payload)
+
+    async def verify_batch(self, addresses):
+        return await self.request("POST", "/verifications/batch", json={"addresses": addresses})
@@ -1,5 +1,7 @@
 from unidecode import unidecode
 
+from accent_cache import strip_accents
+
 REGION_MAPPING = {
     'MONTREAL': [
         # Core Montreal with variations
@@ -269,6 +271,22 @@ POSTAL_CODE_SECTORS = {
     ]
 }
 
+# Reverse indexes for get_custom_sector(), built once at import.
+# setdefault keeps the first sector in definition order, matching the old linear scan.
+FSA_TO_SECTOR = {}
+for sector, postal_codes in POSTAL_CODE_SECTORS.items():
+    for fsa in postal_codes:
+        FSA_TO_SECTOR.setdefault(fsa, sector)
+
+SECTOR_BY_CITY = {}
+SECTOR_BY_UNACCENTED_CITY = {}
+for sector, cities in CUSTOM_SECTORS.items():
+    for city in cities:
+        SECTOR_BY_CITY.setdefault(city.upper(), sector)
+        SECTOR_BY_UNACCENTED_CITY.setdefault(unidecode(city).upper(), sector)
+
+SECTOR_ORDER = {sector: i for i, sector in enumerate(CUSTOM_SECTORS)}
+
 def get_custom_sector(city, postal_code=None):
     """
     Get the custom sector for a given city and postal code.
@@ -278,18 +296,18 @@ def get_custom_sector(city, postal_code=None):
         return None
     
     city_upper = city.upper().strip() if city else ''
-    city_unaccented = unidecode(city_upper)
+    city_unaccented = strip_accents(city_upper)
     postal_prefix = postal_code[:3].upper() if postal_code else ''
     
     # Check postal code first
-    for sector, postal_codes in POSTAL_CODE_SECTORS.items():
-        if postal_prefix and postal_prefix in postal_codes:
-            return sector
+    if postal_prefix and postal_prefix in FSA_TO_SECTOR:
+        return FSA_TO_SECTOR[postal_prefix]
     
-    # Then check city
-    for sector, cities in CUSTOM_SECTORS.items():
-        if any(city_upper == c.upper() or city_unaccented == unidecode(c).upper() for c in cities):
-            return sector
+    # Then check city (exact or unaccented); if both match, the earlier sector wins
+    matches = [sector for sector in (SECTOR_BY_CITY.get(city_upper),
+                                     SECTOR_BY_UNACCENTED_CITY.get(city_unaccented)) if sector]
+    if matches:
+        return min(matches, key=SECTOR_ORDER.get)
     
     return None
 
@@ -304,7 +322,7 @@ def get_shore_region(city):
     city_upper = city.upper().strip()
     
     # Handle accents in lookup
-    city_unaccented = unidecode(city_upper)
+    city_unaccented = strip_accents(city_upper)
     
     # First check if it's in Longueuil agglomeration
     if city_upper in LONGUEUIL_CITIES or city_unaccented in LONGUEUIL_CITIES:
@@ -0,0 +1,101 @@
+# rate_limiter.py
+
+import asyncio
+import threading
+import time
+
+class AsyncTokenBucket:
+    """
+    Token bucket for asyncio tasks: refills at rate tokens per second and holds at
+    most capacity tokens, so short bursts go through at once while the sustained
+    request rate stays under rate. rate=None disables limiting.
+
+    Create it inside the event loop that uses it (its lock belongs to that loop).
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate or 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Waits until a token is available and takes it."""
+        if not self.rate:
+            return
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by worker threads, with additive-increase / multiplicative-decrease
+    of its rate: a throttled() call (the API answered "over quota") halves the rate,
+    down to min_rate, and drains the bucket; succeeded() calls raise it again by about
+    a tenth of max_rate per second until it is back at max_rate. Under quota, requests go out
+    at max_rate; over it, the rate settles just under what the API accepts.
+
+    The requests already in flight when the quota is hit all come back throttled, so
+    the rate is halved at most once per cooldown seconds.
+
+    Also counts requests, throttles and retries for the run.
+    """
+    RECOVERY_STEP = 0.1
+
+    def __init__(self, max_rate, min_rate=0.5, capacity=None, cooldown=1.0):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.rate = max_rate
+        self.capacity = capacity or max(1.0, max_rate)
+        self.cooldown = cooldown
+        self.requests = 0
+        self.throttles = 0
+        self.retries = 0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._last_decrease = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until the caller may send one request."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Take the token now, even into debt, so waiting threads queue up in order
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+            self.requests += 1
+        if wait:
+            time.sleep(wait)
+
+    def throttled(self):
+        with self._lock:
+            self.throttles += 1
+            now = time.monotonic()
+            if self._last_decrease is None or now - self._last_decrease >= self.cooldown:
+                self._last_decrease = now
+                self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0)
+
+    def succeeded(self):
+        with self._lock:
+            # At rate requests per second, this adds RECOVERY_STEP * max_rate per second
+            self.rate = min(self.max_rate, self.rate + self.max_rate * self.RECOVERY_STEP / self.rate)
+
+    def retried(self):
+        with self._lock:
+            self.retries += 1
+
+    def stats(self):
+        with self._lock:
+            return {'requests': self.requests, 'throttles': self.throttles,
+                    'retries': self.retries, 'rate': self.rate}